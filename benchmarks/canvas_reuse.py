@@ -0,0 +1,60 @@
+"""
+Time the typical redraw loop with and without `Figure.reuse_canvas`:
+
+    for i in range(n):
+        fig.delete_plottables()
+        fig.add_plottable(...)
+        fig.save_to_file(...)
+
+Usage: python benchmarks/canvas_reuse.py [iterations]
+"""
+import shutil
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+import ROOT
+
+from rootpy.plotting import Hist1D
+
+from roofie import Figure
+
+
+def run(reuse, iterations, outdir):
+    fig = Figure()
+    fig.reuse_canvas = reuse
+    fig.xtitle = "x"
+    fig.ytitle = "counts"
+    timings = []
+    for i in range(iterations):
+        start = timeit.default_timer()
+        fig.delete_plottables()
+        for j in range(3):
+            h = Hist1D(100, -5, 5)
+            h.FillRandom('gaus', 1000)
+            fig.add_plottable(h, legend_title="hist {0}".format(j))
+        fig.save_to_file(outdir, "fig.pdf")
+        timings.append(timeit.default_timer() - start)
+    # the first iteration includes the creation of the canvas in both modes
+    return np.array(timings[1:]) * 1000
+
+
+def main():
+    ROOT.gROOT.SetBatch(True)
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    outdir = tempfile.mkdtemp()
+    try:
+        results = [(reuse, run(reuse, iterations, outdir)) for reuse in (False, True)]
+    finally:
+        shutil.rmtree(outdir)
+    print("{0:>14} {1:>10} {2:>10} {3:>10}".format("reuse_canvas", "mean/ms", "median/ms", "p90/ms"))
+    for reuse, ms in results:
+        print("{0:>14} {1:10.2f} {2:10.2f} {3:10.2f}".format(str(reuse), ms.mean(), np.median(ms),
+                                                             np.percentile(ms, 90)))
+    print("speedup (median): {0:.2f}x".format(np.median(results[0][1]) / np.median(results[1][1])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+"""
+Benchmarks of roofie's rendering hot paths.
+
+Each run appends one json line to the history file (default
+`benchmarks/results.jsonl`) holding the commit, the environment and
+the timings of every benchmark. With `--compare`, the medians are
+compared to the latest run of a different commit in the history and
+the script exits with 1 if any benchmark got slower than `--threshold`.
+
+Usage:
+    python benchmarks/run.py [--quick] [--only NAME ...] [--repeat N] [--history FILE] [--compare]
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from collections import OrderedDict
+
+import numpy as np
+
+import ROOT
+
+from rootpy.plotting import Hist1D
+
+from roofie import Figure, FigureGrid, Beamerdoc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (setup function, parameters, parameters with --quick)
+# A setup function takes the parameter and a scratch folder, prepares everything
+# for one repetition and returns (callable to be timed, number of items it processes)
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(params, quick_params=None):
+    def register(setup):
+        BENCHMARKS[setup.__name__] = (setup, params, quick_params or params[:1])
+        return setup
+    return register
+
+
+def _hist(nbins=100, nfills=1000):
+    h = Hist1D(nbins, -5, 5)
+    h.FillRandom('gaus', nfills)
+    return h
+
+
+def _figure(nplottables, nbins=100):
+    fig = Figure()
+    fig.xtitle = "x"
+    fig.ytitle = "counts"
+    for i in range(nplottables):
+        fig.add_plottable(_hist(nbins), legend_title="hist {0}".format(i) if i < 10 else '')
+    return fig
+
+
+_IMPORT_CHECK = """
+import sys
+import roofie
+fig = roofie.Figure()
+fig.style = roofie.Styles.Public_full
+sys.exit(1 if 'ROOT' in sys.modules or 'rootpy' in sys.modules else 0)
+"""
+
+
+# fresh interpreters importing roofie and setting up a figure; this must not load ROOT
+@benchmark([10], [3])
+def import_roofie(n, outdir):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(HERE)] + [p for p in [env.get('PYTHONPATH')] if p])
+    cmd = [sys.executable, '-c', _IMPORT_CHECK]
+    if subprocess.call(cmd, env=env) != 0:
+        raise RuntimeError("Importing roofie loads ROOT or rootpy")
+
+    def run():
+        for _ in range(n):
+            subprocess.check_call(cmd, env=env)
+    return run, n
+
+
+@benchmark([1000, 10000], [100])
+def add_plottable_clone(n, outdir):
+    hists = [_hist(1000) for _ in range(n)]
+    fig = Figure()
+
+    def run():
+        for h in hists:
+            fig.add_plottable(h)
+    return run, n
+
+
+@benchmark([1, 10, 100, 1000, 10000], [1, 100])
+def draw_to_canvas(n, outdir):
+    fig = _figure(n)
+    return fig.draw_to_canvas, n
+
+
+@benchmark([10 ** 5, 10 ** 6], [10 ** 5])
+def draw_large_graph(npoints, outdir):
+    x = np.linspace(0, 10, npoints)
+    fig = Figure()
+    fig.add_plottable((x, np.sin(x)))
+    return fig.draw_to_canvas, npoints
+
+
+@benchmark([10 ** 5, 10 ** 6], [10 ** 5])
+def draw_large_hist(nbins, outdir):
+    fig = Figure()
+    fig.add_plottable(_hist(nbins, 10 ** 5))
+    return fig.draw_to_canvas, nbins
+
+
+@benchmark([50], [5])
+def save_to_file(n, outdir):
+    figures = [_figure(3) for _ in range(n)]
+
+    def run():
+        for i, fig in enumerate(figures):
+            fig.save_to_file(outdir, "fig_{0}.pdf".format(i))
+    return run, n
+
+
+@benchmark([50], [5])
+def save_to_root_file(n, outdir):
+    figures = [_figure(3) for _ in range(n)]
+    fname = os.path.join(outdir, "figures.root")
+
+    def run():
+        f = ROOT.TFile.Open(fname, 'recreate')
+        for i, fig in enumerate(figures):
+            fig.save_to_root_file(f, "fig_{0}".format(i))
+        f.Close()
+    return run, n
+
+
+@benchmark([100], [10])
+def to_spec(n, outdir):
+    figures = [_figure(3, 1000) for _ in range(n)]
+
+    def run():
+        for fig in figures:
+            fig.to_spec()
+    return run, n
+
+
+@benchmark([100], [10])
+def from_spec(n, outdir):
+    specs = [_figure(3, 1000).to_spec() for _ in range(n)]
+
+    def run():
+        for data in specs:
+            Figure.from_spec(data)
+    return run, n
+
+
+@benchmark([100], [10])
+def import_plottables_from_canvas(n, outdir):
+    canvases = [_figure(3).draw_to_canvas() for _ in range(n)]
+
+    def run():
+        for c in canvases:
+            Figure().import_plottables_from_canvas(c)
+    return run, n
+
+
+@benchmark([100], [5])
+def redraw_loop(n, outdir):
+    fig = Figure()
+    fig.reuse_canvas = True
+    hists = [[_hist() for _ in range(3)] for _ in range(n)]
+
+    def run():
+        for batch in hists:
+            fig.delete_plottables()
+            for h in batch:
+                fig.add_plottable(h)
+            fig.draw_to_canvas()
+    return run, n
+
+
+@benchmark([64], [4])
+def save_cells_separately(n, outdir):
+    # the same cells once as separate files for comparison with `save_grid`
+    figures = [_figure(2) for _ in range(n)]
+
+    def run():
+        for i, fig in enumerate(figures):
+            fig.save_to_file(outdir, "cell_{0}.pdf".format(i))
+    return run, n
+
+
+@benchmark([64], [4])
+def save_grid(n, outdir):
+    grid = FigureGrid(int(np.ceil(np.sqrt(n))), int(np.ceil(np.sqrt(n))))
+    for i in range(n):
+        grid[divmod(i, grid.ncols)] = _figure(2)
+
+    def run():
+        grid.save_to_file(outdir, "grid.pdf")
+    return run, n
+
+
+@benchmark([100], [5])
+def finalize_document(n, outdir):
+    doc = Beamerdoc("Benchmark", "roofie benchmark")
+    doc.output_dir = os.path.join(outdir, 'beamer')
+    sec = doc.add_section("Figures")
+    for _ in range(n):
+        sec.add_figure(_figure(3))
+    return doc.finalize_document, n
+
+
+def _git_commit():
+    try:
+        out = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=HERE)
+        dirty = subprocess.call(['git', 'diff', '--quiet', 'HEAD'], cwd=HERE) != 0
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return out.decode('ascii').strip(), dirty
+
+
+def _time(setup, param, repeat):
+    """
+    Timings in seconds of `repeat` repetitions of the benchmark `setup` with `param`
+    """
+    timings = []
+    nitems = None
+    for _ in range(repeat):
+        outdir = tempfile.mkdtemp(prefix='roofie_bench')
+        try:
+            run, nitems = setup(param, outdir)
+            start = timeit.default_timer()
+            run()
+            timings.append(timeit.default_timer() - start)
+        finally:
+            shutil.rmtree(outdir, ignore_errors=True)
+    return timings, nitems
+
+
+def run_benchmarks(names, quick, repeat):
+    results = OrderedDict()
+    for name in names:
+        setup, params, quick_params = BENCHMARKS[name]
+        for param in (quick_params if quick else params):
+            key = "{0}[{1}]".format(name, param)
+            try:
+                timings, nitems = _time(setup, param, repeat)
+            except Exception as e:
+                print("{0:<40} failed: {1}".format(key, e))
+                results[key] = {'error': str(e)}
+                continue
+            median = float(np.median(timings))
+            results[key] = {'median': median, 'min': min(timings), 'max': max(timings),
+                            'repeat': repeat, 'items': nitems, 'per_item': median / nitems}
+            print("{0:<40} median {1:9.2f} ms  ({2:.3f} ms per item)".format(key, median * 1000,
+                                                                             median / nitems * 1000))
+    return results
+
+
+def _previous_run(history, commit, quick):
+    """
+    The latest run in `history` with the same sizes which was made for a different commit
+    """
+    previous = None
+    try:
+        with open(history) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                if entry.get('commit') != commit and entry.get('quick') == quick:
+                    previous = entry
+    except IOError:
+        pass
+    return previous
+
+
+def compare(results, previous, threshold):
+    """
+    Print the change of each benchmark relative to `previous`
+
+    Returns
+    -------
+    list :
+        Names of the benchmarks which got slower than `threshold`
+    """
+    regressions = []
+    print("\nCompared to {0} ({1}):".format(previous.get('commit'), previous.get('date')))
+    for key, res in results.items():
+        old = previous['results'].get(key)
+        if 'median' not in res or not old or 'median' not in old:
+            continue
+        ratio = res['median'] / old['median']
+        flag = ''
+        if ratio > threshold:
+            regressions.append(key)
+            flag = '  <-- regression'
+        print("{0:<40} {1:6.2f}x{2}".format(key, ratio, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help="Smaller sizes, eg. for CI")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--history', default=os.path.join(HERE, 'results.jsonl'))
+    parser.add_argument('--compare', action='store_true', help="Compare to the previous commit in the history")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="Slowdown factor of the median counted as a regression")
+    args = parser.parse_args()
+
+    ROOT.gROOT.SetBatch(True)
+    commit, dirty = _git_commit()
+    previous = _previous_run(args.history, commit, args.quick) if args.compare else None
+    results = run_benchmarks(args.only, args.quick, args.repeat)
+    entry = OrderedDict([
+        ('commit', commit),
+        ('dirty', dirty),
+        ('date', time.strftime('%Y-%m-%dT%H:%M:%S')),
+        ('quick', args.quick),
+        ('python', platform.python_version()),
+        ('root', ROOT.gROOT.GetVersion()),
+        ('host', platform.node()),
+        ('results', results),
+    ])
+    with open(args.history, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+
+    if previous is not None:
+        if compare(results, previous, args.threshold):
+            sys.exit(1)
+    elif args.compare:
+        print("\nNo previous run of another commit in {0}".format(args.history))
+
+
+if __name__ == '__main__':
+    main()
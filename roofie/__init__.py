@@ -1,2 +1,9 @@
+from ._root import set_batch
 from .figure import Figure, Styles, get_color_generator
+from .grid import FigureGrid
 from .beamify import Beamerdoc
+from .batch import render_many
+from .writers import PdfBook, RootFileWriter
+from .loader import iter_figures
+from .profiling import RenderProfile, add_render_hook, remove_render_hook
+from .background import flush
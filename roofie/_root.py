@@ -0,0 +1,84 @@
+"""
+Lazy access to ROOT and rootpy.
+
+Importing ROOT (and rootpy with it) takes seconds, so roofie's modules
+do not import it themselves but use the stand-ins of this module. The
+actual import happens on the first attribute access, ie. when the first
+figure is drawn or the first ROOT object is inspected. Until then,
+`import roofie` and setting up `Figure`s and their styles is cheap and
+does not touch ROOT's global state.
+"""
+
+import importlib
+import logging
+import sys
+
+# batch mode requested with `set_batch` before ROOT was loaded
+_batch = None
+
+
+def _setup_root(module):
+    """
+    Called once right after ROOT was imported
+    """
+    if _batch is not None:
+        module.gROOT.SetBatch(_batch)
+    # rootpy logs a message for each file written by TCanvas::Print
+    logging.getLogger("ROOT.TCanvas.Print").setLevel(logging.WARNING)
+
+
+class _LazyModule(object):
+    """
+    Stand-in for the module `name` which is imported on first use
+    """
+    def __init__(self, name, setup=None):
+        self._lazy_name = name
+        self._lazy_setup = setup
+        self._lazy_module = None
+
+    def _load(self):
+        if self._lazy_module is None:
+            module = importlib.import_module(self._lazy_name)
+            if self._lazy_setup is not None:
+                self._lazy_setup(module)
+            self._lazy_module = module
+        return self._lazy_module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._lazy_module is not None else "not loaded"
+        return "<lazy module '{0}' ({1})>".format(self._lazy_name, state)
+
+
+ROOT = _LazyModule('ROOT', _setup_root)
+plotting = _LazyModule('rootpy.plotting')
+
+
+def asrootpy(*args, **kwargs):
+    from rootpy import asrootpy
+    return asrootpy(*args, **kwargs)
+
+
+def root_loaded():
+    """
+    True if ROOT was imported, by roofie or anybody else
+    """
+    return 'ROOT' in sys.modules
+
+
+def set_batch(batch=True):
+    """
+    Turn ROOT's batch mode on (or off), so that canvases are never
+    shown on screen. Use this for rendering without a display, eg. on
+    a cluster. If ROOT is not loaded yet, the setting is applied as
+    soon as it is, and ROOT is not loaded by this call.
+    """
+    global _batch
+    _batch = batch
+    if ROOT._lazy_module is not None:
+        ROOT.gROOT.SetBatch(batch)
+    elif root_loaded():
+        # somebody else imported ROOT already
+        ROOT._load()
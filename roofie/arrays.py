@@ -0,0 +1,219 @@
+"""
+Access the data of ROOT plottables as NumPy arrays.
+
+Wherever ROOT exposes its internal buffers (bin contents, sumw2,
+graph points) the returned arrays are views onto that memory, i.e.
+no copy is made. Do not hold on to them after the plottable is gone!
+"""
+
+import numpy as np
+
+from ._root import ROOT
+
+# TH1 classes store their contents by inheriting from one of these arrays
+_HIST_ARRAY_TYPES = (
+    ('TArrayD', np.float64),
+    ('TArrayF', np.float32),
+    ('TArrayI', np.int32),
+    ('TArrayS', np.int16),
+    ('TArrayC', np.int8),
+)
+
+
+def _as_array(buf, n, dtype=np.float64):
+    """
+    View a buffer returned by (Py)ROOT as a NumPy array of length `n`
+    """
+    if n == 0:
+        return np.zeros(0, dtype=dtype)
+    if hasattr(buf, 'reshape'):
+        # cppyy's LowLevelView (ROOT >= 6.22) does not know its size
+        buf.reshape((n, ))
+    elif hasattr(buf, 'SetSize'):
+        # same for the buffers of the legacy PyROOT
+        buf.SetSize(n)
+    return np.frombuffer(buf, dtype=dtype, count=n)
+
+
+def hist_edges(h):
+    """
+    Bin edges of the x-axis of `h`; `nbins + 1` values
+    """
+    axis = h.GetXaxis()
+    nbins = axis.GetNbins()
+    xbins = axis.GetXbins()
+    if xbins.GetSize() > 0:
+        return _as_array(xbins.GetArray(), nbins + 1)
+    return np.linspace(axis.GetXmin(), axis.GetXmax(), nbins + 1)
+
+
+def _hist_ncells(h):
+    try:
+        return h.GetNcells()
+    except AttributeError:
+        # ROOT 5
+        return h.GetSize()
+
+
+def hist_contents(h):
+    """
+    Contents of all cells of `h` including under- and overflow
+    """
+    n = _hist_ncells(h)
+    if not isinstance(h, ROOT.TProfile):
+        for array_type, dtype in _HIST_ARRAY_TYPES:
+            if isinstance(h, getattr(ROOT, array_type)):
+                return _as_array(h.GetArray(), n, dtype)
+    # TProfiles store sums; let ROOT do the division
+    return np.array([h.GetBinContent(i) for i in range(n)], dtype=np.float64)
+
+
+def hist_errors(h):
+    """
+    Lower and upper errors of all cells of `h` including under- and overflow
+
+    Returns
+    -------
+    tuple :
+        Arrays (low, high)
+    """
+    n = _hist_ncells(h)
+    if isinstance(h, ROOT.TProfile) or h.GetBinErrorOption() != ROOT.TH1.kNormal:
+        low = np.array([h.GetBinErrorLow(i) for i in range(n)], dtype=np.float64)
+        high = np.array([h.GetBinErrorUp(i) for i in range(n)], dtype=np.float64)
+        return low, high
+    if h.GetSumw2N() > 0:
+        err = np.sqrt(_as_array(h.GetSumw2().GetArray(), n))
+    else:
+        err = np.sqrt(np.abs(hist_contents(h).astype(np.float64)))
+    return err, err
+
+
+def graph_arrays(g):
+    """
+    Points and errors of the TGraph `g`
+
+    Returns
+    -------
+    tuple :
+        Arrays (x, y, exl, exh, eyl, eyh); graphs without errors get zeros
+    """
+    n = g.GetN()
+    x = _as_array(g.GetX(), n)
+    y = _as_array(g.GetY(), n)
+    if isinstance(g, ROOT.TGraphAsymmErrors):
+        errors = [_as_array(g.GetEXlow(), n), _as_array(g.GetEXhigh(), n),
+                  _as_array(g.GetEYlow(), n), _as_array(g.GetEYhigh(), n)]
+    elif isinstance(g, ROOT.TGraphErrors):
+        ex = _as_array(g.GetEX(), n)
+        ey = _as_array(g.GetEY(), n)
+        errors = [ex, ex, ey, ey]
+    else:
+        zeros = np.zeros(n)
+        errors = [zeros] * 4
+    return tuple([x, y] + errors)
+
+
+def _error_pair(err, n):
+    """
+    (low, high) arrays from a symmetric error of shape (n, ) or asymmetric one of shape (2, n)
+    """
+    err = np.asarray(err, dtype=np.float64)
+    if err.ndim == 2:
+        if err.shape != (2, n):
+            raise ValueError("Asymmetric errors must have the shape (2, {0}), got {1}".format(n, err.shape))
+        return err[0], err[1]
+    if err.shape != (n, ):
+        raise ValueError("Errors must have the shape ({0}, ), got {1}".format(n, err.shape))
+    return err, err
+
+
+def graph_from_arrays(arrays, name=''):
+    """
+    Build a TGraph from a tuple of array-likes in one go
+
+    Parameters
+    ----------
+    arrays : tuple
+        `(x, y)` gives a TGraph; `(x, y, yerr)` and `(x, y, xerr, yerr)`
+        give a TGraphErrors or a TGraphAsymmErrors if any error has the
+        shape (2, n) of (low, high) errors. `(x, y, exl, exh, eyl, eyh)`
+        always gives a TGraphAsymmErrors.
+    name : string
+        Name of the new graph
+
+    Returns
+    -------
+    TGraph :
+        The graph; ROOT copies the (contiguous float64) buffers with a
+        single memcpy each, so there is no Python loop over the points.
+    """
+    if len(arrays) not in (2, 3, 4, 6):
+        raise ValueError("Expected (x, y), (x, y, yerr), (x, y, xerr, yerr) or "
+                         "(x, y, exl, exh, eyl, eyh), got a tuple of length {0}".format(len(arrays)))
+    x = np.ascontiguousarray(arrays[0], dtype=np.float64)
+    y = np.ascontiguousarray(arrays[1], dtype=np.float64)
+    n = len(x)
+    if x.shape != (n, ) or y.shape != (n, ):
+        raise ValueError("x and y must be one dimensional and of equal length")
+    if len(arrays) == 2:
+        g = ROOT.TGraph(n, x, y)
+    else:
+        if len(arrays) == 3:
+            zeros = np.zeros(n)
+            (exl, exh), (eyl, eyh) = (zeros, zeros), _error_pair(arrays[2], n)
+        elif len(arrays) == 4:
+            (exl, exh), (eyl, eyh) = _error_pair(arrays[2], n), _error_pair(arrays[3], n)
+        else:
+            exl, exh, eyl, eyh = [_error_pair(err, n)[0] for err in arrays[2:]]
+        symmetric = len(arrays) != 6 and exl is exh and eyl is eyh
+        errors = [np.ascontiguousarray(err, dtype=np.float64) for err in (exl, exh, eyl, eyh)]
+        if symmetric:
+            g = ROOT.TGraphErrors(n, x, y, errors[0], errors[2])
+        else:
+            g = ROOT.TGraphAsymmErrors(n, x, y, *errors)
+    g.SetName(name)
+    return g
+
+
+def function_parameters(f):
+    """
+    Parameters of the TF1 `f`
+    """
+    return np.array([f.GetParameter(i) for i in range(f.GetNpar())], dtype=np.float64)
+
+
+def plottable_nbytes(obj):
+    """
+    Estimate of the memory used by a plottable including its data arrays
+
+    Returns
+    -------
+    int :
+        Size in bytes
+    """
+    nbytes = ROOT.TClass.GetClass(obj.ClassName()).Size()
+    if isinstance(obj, ROOT.TH1):
+        ncells = _hist_ncells(obj)
+        itemsize = 8
+        for array_type, dtype in _HIST_ARRAY_TYPES:
+            if isinstance(obj, getattr(ROOT, array_type)):
+                itemsize = np.dtype(dtype).itemsize
+                break
+        nbytes += ncells * itemsize + obj.GetSumw2N() * 8
+        if isinstance(obj, ROOT.TProfile):
+            # bin entries and sum of squares
+            nbytes += 2 * ncells * 8
+        for axis in (obj.GetXaxis(), obj.GetYaxis(), obj.GetZaxis()):
+            nbytes += axis.GetXbins().GetSize() * 8
+    elif isinstance(obj, ROOT.TGraph):
+        if isinstance(obj, ROOT.TGraphAsymmErrors):
+            narrays = 6
+        elif isinstance(obj, ROOT.TGraphErrors):
+            narrays = 4
+        else:
+            narrays = 2
+        nbytes += obj.GetMaxSize() * narrays * 8
+    elif isinstance(obj, ROOT.TF1):
+        nbytes += obj.GetNpar() * 8 * 3  # values, errors and limits
+    return nbytes
@@ -0,0 +1,271 @@
+"""
+Save figures in a background render process while the caller carries on.
+
+`Figure.save_to_file_async` and `Figure.save_to_root_file_async` take a
+snapshot of the figure (see `Figure.to_spec`) and put it on a bounded
+queue. A single render process, forked on first use, draws and writes
+the figures in the order they were submitted. When the queue is full,
+submitting blocks until the render process caught up, so a fast loop
+cannot pile up an unbounded number of snapshots in memory.
+
+Each submission returns a `RenderFuture`. Call `roofie.flush()` to wait
+for all pending writes, eg. before the job exits or before reading a
+root file written in the background. Pending writes are also flushed
+when the interpreter exits.
+"""
+
+import atexit
+import itertools
+import logging
+import os
+import threading
+import traceback
+
+try:
+    import queue
+except ImportError:
+    # python 2
+    import Queue as queue
+
+from ._root import ROOT
+from .batch import _mp
+from .spec import figure_from_spec, loads
+
+log = logging.getLogger("roofie.background")
+
+# Number of snapshots which may wait for the render process before submitting blocks
+max_pending = 16
+# Seconds between checks if the render process is still alive
+_POLL_INTERVAL = 0.1
+
+
+class RenderFuture(object):
+    """
+    Outcome of a figure saved in the background
+    """
+    def __init__(self):
+        self._event = threading.Event()
+        self._value = None
+        self._error = None
+
+    def _set(self, value=None, error=None):
+        self._value = value
+        self._error = error
+        self._event.set()
+
+    def done(self):
+        """
+        True if the figure was written or failed to be
+        """
+        return self._event.is_set()
+
+    def exception(self, timeout=None):
+        """
+        Wait for the render and return the error as a `RuntimeError`, or `None` on success
+        """
+        if not self._event.wait(timeout):
+            raise RuntimeError("Render did not finish within {0}s".format(timeout))
+        return RuntimeError(self._error) if self._error is not None else None
+
+    def result(self, timeout=None):
+        """
+        Wait for the render and return the path of the written file
+
+        Raises
+        ------
+        RuntimeError :
+            If the render failed or did not finish within `timeout` seconds
+        """
+        error = self.exception(timeout)
+        if error is not None:
+            raise error
+        return self._value
+
+
+def _render_job(kind, spec, args, writers):
+    if kind == 'flush':
+        for writer in writers.values():
+            writer.close()
+        writers.clear()
+        return None
+    fig = figure_from_spec(loads(spec))
+    if kind == 'file':
+        path, name = args
+        fig.save_to_file(path, name)
+        return os.path.join(path, name)
+    if kind == 'root':
+        from .writers import RootFileWriter
+        fname, name, path = args
+        writer = writers.get(fname)
+        if writer is None:
+            writer = writers[fname] = RootFileWriter(fname, mode='update')
+        writer.write(fig, name, path)
+        return fname
+    raise ValueError("Unknown job '{0}'".format(kind))
+
+
+def _renderer_main(jobs, results):
+    """
+    Main loop of the render process. Receives `(id, kind, spec, args)`
+    jobs and sends back `(id, value, error)`. A `None` job ends it.
+    """
+    ROOT.gROOT.SetBatch(True)
+    # root files stay open between jobs; closed by 'flush' jobs
+    writers = {}
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id, kind, spec, args = job
+        try:
+            value = _render_job(kind, spec, args, writers)
+        except Exception as e:
+            log.debug(traceback.format_exc())
+            results.put((job_id, None, "{0}: {1}".format(type(e).__name__, e)))
+        else:
+            results.put((job_id, value, None))
+    for writer in writers.values():
+        writer.close()
+
+
+class _Renderer(object):
+    """
+    Handle for the render process, its queues and the futures of the pending jobs
+    """
+    def __init__(self, maxsize):
+        self.jobs = _mp.Queue(maxsize)
+        self.results = _mp.Queue()
+        self.process = _mp.Process(target=_renderer_main, args=(self.jobs, self.results))
+        self.process.daemon = True
+        self.process.start()
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        # failed jobs since the last flush
+        self.nfailed = 0
+        self._thread = threading.Thread(target=self._dispatch_results)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def alive(self):
+        return self.process.is_alive()
+
+    def submit(self, kind, spec=None, args=()):
+        """
+        Queue a job; blocks while the queue is full
+        """
+        future = RenderFuture()
+        job_id = next(self._ids)
+        with self._lock:
+            self._futures[job_id] = future
+        job = (job_id, kind, spec, args)
+        while True:
+            try:
+                self.jobs.put(job, timeout=_POLL_INTERVAL)
+                break
+            except queue.Full:
+                if not self.alive():
+                    self._fail_pending()
+                    break
+        return future
+
+    def _fail_pending(self):
+        msg = "render process died with exit code {0}".format(self.process.exitcode)
+        with self._lock:
+            futures, self._futures = self._futures, {}
+            self.nfailed += len(futures)
+        if futures:
+            log.error("{0}; {1} pending renders are lost".format(msg, len(futures)))
+        for future in futures.values():
+            future._set(error=msg)
+
+    def _dispatch_results(self):
+        while True:
+            try:
+                msg = self.results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if not self.alive():
+                    self._fail_pending()
+                    return
+                continue
+            job_id, value, error = msg
+            with self._lock:
+                future = self._futures.pop(job_id, None)
+                if error is not None:
+                    self.nfailed += 1
+            if error is not None:
+                log.error("Background render failed: {0}".format(error))
+            if future is not None:
+                future._set(value, error)
+
+    def shutdown(self, timeout=None):
+        if self.alive():
+            self.jobs.put(None)
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        self._thread.join(2 * _POLL_INTERVAL + 1)
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def _get_renderer():
+    """
+    The render process; (re)started on demand
+    """
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None or not _renderer.alive():
+            if _renderer is not None:
+                _renderer.shutdown()
+            _renderer = _Renderer(max_pending)
+        return _renderer
+
+
+def submit(kind, spec, args):
+    return _get_renderer().submit(kind, spec, args)
+
+
+def flush(timeout=None):
+    """
+    Wait until all figures submitted so far are written and close the
+    root files used by `save_to_root_file_async`.
+
+    Parameters
+    ----------
+    timeout : float
+        Seconds to wait at most; `None` waits as long as it takes
+
+    Returns
+    -------
+    int :
+        Number of renders which failed since the previous flush. Their
+        errors are logged and available from their futures.
+    """
+    renderer = _renderer
+    if renderer is None:
+        return 0
+    if renderer.alive():
+        # the render process works through its queue in order
+        renderer.submit('flush').result(timeout)
+    with renderer._lock:
+        nfailed, renderer.nfailed = renderer.nfailed, 0
+    return nfailed
+
+
+def _shutdown():
+    global _renderer
+    if _renderer is None:
+        return
+    try:
+        flush()
+    except RuntimeError as e:
+        log.error("Could not flush the pending renders: {0}".format(e))
+    _renderer.shutdown(timeout=5)
+    _renderer = None
+
+
+atexit.register(_shutdown)
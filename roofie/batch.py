@@ -0,0 +1,212 @@
+"""
+Render many figures in a pool of worker processes.
+
+The workers are forked from the calling process. Hence, the figures do
+not need to be pickled and every worker starts out with its own copy of
+ROOT's global state (eg. `gStyle`) which it may mess up without
+affecting anybody else. A crash (segfault) in ROOT only takes down the
+worker which was rendering at that moment; it is then replaced by a
+fresh one and the remaining figures are rendered as usual.
+"""
+
+import collections
+import functools
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+
+from ._root import ROOT
+
+log = logging.getLogger("roofie.batch")
+
+# Workers rely on inheriting the figures from the parent process
+try:
+    _mp = multiprocessing.get_context('fork')
+except AttributeError:
+    # python 2 always forks on posix
+    _mp = multiprocessing
+
+RenderResult = collections.namedtuple('RenderResult', ['index', 'path', 'success', 'error'])
+
+
+def _worker_main(conn, tasks):
+    """
+    Main loop of a worker process. Receives the index of a task, runs
+    it and sends back `(index, success, value, error)`. A `None` index
+    ends the worker.
+    """
+    ROOT.gROOT.SetBatch(True)
+    while True:
+        try:
+            index = conn.recv()
+        except EOFError:
+            return
+        if index is None:
+            return
+        try:
+            value = tasks[index]()
+        except Exception as e:
+            log.debug(traceback.format_exc())
+            conn.send((index, False, None, "{0}: {1}".format(type(e).__name__, e)))
+            continue
+        try:
+            conn.send((index, True, value, None))
+        except Exception as e:
+            # eg. the return value cannot be pickled
+            log.debug(traceback.format_exc())
+            conn.send((index, False, None, "{0}: {1}".format(type(e).__name__, e)))
+
+
+class _Worker(object):
+    """
+    Handle for one worker process running one task at a time
+    """
+    def __init__(self, tasks):
+        self.conn, child_conn = _mp.Pipe()
+        self.process = _mp.Process(target=_worker_main, args=(child_conn, tasks))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+        self.task = None
+        self.started = None
+        self.ntasks = 0
+
+    def submit(self, index):
+        self.task = index
+        self.started = time.time()
+        self.ntasks += 1
+        self.conn.send(index)
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.terminate()
+        else:
+            try:
+                self.conn.send(None)
+            except (IOError, OSError):
+                pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+
+def _run_tasks(tasks, workers=None, max_tasks_per_worker=None, timeout=None, poll_interval=0.01):
+    """
+    Run the given callables in forked worker processes.
+
+    Parameters
+    ----------
+    tasks : list
+        Callables without arguments. Their return values have to be picklable.
+    workers : int
+        Number of worker processes; defaults to the number of cpus
+    max_tasks_per_worker : int
+        Replace a worker by a fresh process after this many tasks. `None` means never.
+    timeout : float
+        Seconds after which a running task is killed together with its worker
+
+    Returns
+    -------
+    list :
+        `(success, value, error)` tuples in the order of `tasks`
+    """
+    results = [None] * len(tasks)
+    pending = collections.deque(range(len(tasks)))
+    nworkers = max(1, min(workers or multiprocessing.cpu_count(), len(tasks)))
+    pool = [None] * nworkers
+
+    def fail(worker, msg):
+        log.error("Task {0}: {1}".format(worker.task, msg))
+        results[worker.task] = (False, None, msg)
+
+    def died(slot, worker):
+        worker.process.join(1)
+        fail(worker, "worker died with exit code {0}".format(worker.process.exitcode))
+        worker.stop(kill=True)
+        pool[slot] = None
+
+    try:
+        while pending or any(w is not None and w.task is not None for w in pool):
+            progress = False
+            for slot, worker in enumerate(pool):
+                if worker is None or worker.task is None:
+                    if not pending:
+                        continue
+                    if worker is not None and max_tasks_per_worker and worker.ntasks >= max_tasks_per_worker:
+                        worker.stop()
+                        worker = None
+                    if worker is None:
+                        worker = pool[slot] = _Worker(tasks)
+                    try:
+                        worker.submit(pending.popleft())
+                    except (EOFError, IOError, OSError):
+                        died(slot, worker)
+                    progress = True
+                    continue
+                if worker.conn.poll():
+                    try:
+                        index, success, value, error = worker.conn.recv()
+                    except (EOFError, IOError, OSError):
+                        died(slot, worker)
+                    else:
+                        results[index] = (success, value, error)
+                        worker.task = None
+                    progress = True
+                elif not worker.process.is_alive():
+                    died(slot, worker)
+                    progress = True
+                elif timeout is not None and time.time() - worker.started > timeout:
+                    fail(worker, "timed out after {0}s".format(timeout))
+                    worker.stop(kill=True)
+                    pool[slot] = None
+                    progress = True
+            if not progress:
+                time.sleep(poll_interval)
+    finally:
+        for worker in pool:
+            if worker is not None:
+                worker.stop(kill=worker.task is not None)
+    return results
+
+
+def _render_figure(fig, outdir, name):
+    fig.save_to_file(outdir, name)
+    return os.path.join(outdir, name)
+
+
+def render_many(figures, outdir, names=None, workers=None, max_renders_per_worker=50, timeout=None):
+    """
+    Save many figures to pdf files using a pool of worker processes.
+
+    Parameters
+    ----------
+    figures : list
+        Figures to be rendered
+    outdir : string
+        Folder where the files are written to
+    names : list
+        File names including the extension; defaults to `figure_0000.pdf`, ...
+    workers : int
+        Number of worker processes; defaults to the number of cpus
+    max_renders_per_worker : int
+        Recycle a worker after this many renders to keep ROOT's memory in check
+    timeout : float
+        Seconds after which a render is stopped and reported as failed
+
+    Returns
+    -------
+    list :
+        One `RenderResult(index, path, success, error)` per figure, in the given order
+    """
+    figures = list(figures)
+    if names is None:
+        names = ["figure_{0:04d}.pdf".format(i) for i in range(len(figures))]
+    if len(names) != len(figures):
+        raise ValueError("Number of names does not match the number of figures")
+    tasks = [functools.partial(_render_figure, fig, outdir, name) for fig, name in zip(figures, names)]
+    results = _run_tasks(tasks, workers=workers, max_tasks_per_worker=max_renders_per_worker, timeout=timeout)
+    return [RenderResult(i, path, success, error) for i, (success, path, error) in enumerate(results)]
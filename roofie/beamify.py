@@ -6,16 +6,21 @@ At the same time, it tries to abstract earthly problems like uniqueness of the f
 This is at the expense of customizability of the folder structure
 """
 
+import functools
+import hashlib
+import logging
 import os
-import random
 import re
-import string
 import subprocess
 import textwrap
 
+from ._root import ROOT
+from .batch import _run_tasks
+from .cache import figure_digest, canvas_digest, grid_digest
 from .figure import Figure
+from .grid import FigureGrid
 
-import ROOT.TCanvas
+log = logging.getLogger("roofie.beamify")
 
 try:
     from subprocess import check_output
@@ -40,6 +45,44 @@ def _safe_folder_name(unsafe):
     return "".join([ch for ch in unsafe if t.match(ch)])
 
 
+def _write_figure_to_disc(fig, folder, name, path_from_latex_root):
+    """
+    Write a Figure, FigureGrid or TCanvas to `folder/name`. The file is written
+    under a temporary name first so that an interrupted build never
+    leaves a broken file which looks up to date.
+
+    Returns
+    -------
+    string :
+        The given `path_from_latex_root`
+    """
+    tmp_name = "_tmp_" + name
+    if isinstance(fig, (Figure, FigureGrid)):
+        fig.save_to_file(folder, tmp_name)
+    if isinstance(fig, ROOT.TCanvas):
+        # make sure the folder exists
+        try:
+            os.makedirs(folder)
+        except OSError:
+            pass
+        # root needs to draw the canvas first otherwise it crashes, sometimes...
+        fig.Draw()
+        fig.SaveAs(os.path.join(folder, tmp_name))
+    os.rename(os.path.join(folder, tmp_name), os.path.join(folder, name))
+    return path_from_latex_root
+
+
+def _file_digest(path):
+    """
+    sha1 of the file at `path` or `None` if it does not exist
+    """
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except IOError:
+        return None
+
+
 class Beamerdoc(object):
     def __init__(self, author, title):
         self.title = title
@@ -96,23 +139,31 @@ class Beamerdoc(object):
         def add_figure(self, fig):
             self.figures.append(fig)
 
-        def _make_section_body(self):
+        def _make_section_body(self, fig_paths):
             """
-            Convert this section to latex. This writes the figures to disc
+            Convert this section to latex.
+
+            Parameters
+            ----------
+            fig_paths : list
+                Paths to the figures of this section as returned by the
+                tasks of `_figure_tasks`; `None` for figures which failed
 
             Returns
             -------
             string :
                 Latex code for this section with linkes to the figures already included
             """
-            fig_paths = self._write_figures_to_disc()
             section_body = '\section{{{0}}}'.format(self.title)
             figs_per_frame = 4
             frame_num = None
             for frame_num in xrange(0, len(fig_paths), figs_per_frame):
                 ig_cmds = ['' for i in range(figs_per_frame)]
                 for fig_num_frame, path in enumerate(fig_paths[frame_num:(frame_num + figs_per_frame)]):
-                    ig_cmds[fig_num_frame] = format(r'\includegraphics[width=\textwidth]{{{0}}}'.format(path))
+                    if path is None:
+                        ig_cmds[fig_num_frame] = r'\textbf{{Figure {0} failed}}'.format(frame_num + fig_num_frame)
+                    else:
+                        ig_cmds[fig_num_frame] = format(r'\includegraphics[width=\textwidth]{{{0}}}'.format(path))
                 section_body += self.frame_template.format(title=self.title, *ig_cmds)
             # were there no figures in this section?
             if frame_num is None:
@@ -120,63 +171,183 @@ class Beamerdoc(object):
                 section_body += self.frame_template.format(title=self.title, *ig_cmds)
             return section_body
 
-        def _write_figures_to_disc(self):
+        def _folder(self):
+            """
+            Folder of this section's figures relative to the tex file
+            """
+            return os.path.join('figures/', _safe_folder_name(self.title))
+
+        def _figure_tasks(self):
             """
-            Write the figures of this section to disc.
+            Create one task per figure of this section which writes it
+            to disc. The file names are derived from the figures'
+            content, so figures which are already on disc need no task.
 
             Returns
             -------
             list :
-                Paths to the files written to disc, relative to where the tex file will be
+                `(path, task)` pairs where `path` is relative to where
+                the tex file will be. `task` is a callable without
+                arguments returning `path` or `None` if the file is up
+                to date.
             """
-            paths = []
-            fig_folder_safe = os.path.join('figures/', _safe_folder_name(self.title))
+            tasks = []
+            fig_folder_safe = self._folder()
+            fig_path_from_latex_root = os.path.join(self.document.output_dir, fig_folder_safe)
             for fig in self.figures:
-                rand_name = ''.join(random.choice(string.ascii_letters) for _ in range(5)) + ".pdf"
-                fig_path_from_latex_root = os.path.join(self.document.output_dir, fig_folder_safe)
                 if isinstance(fig, Figure):
-                    fig.save_to_file(fig_path_from_latex_root, rand_name)
-                if isinstance(fig, ROOT.TCanvas):
-                    # make sure the folder exists
-                    try:
-                        os.makedirs(fig_path_from_latex_root)
-                    except OSError:
-                        pass
-                    # root needs to draw the canvas first otherwise it crashes, sometimes...
-                    fig.Draw()
-                    fig.SaveAs(os.path.join(fig_path_from_latex_root, rand_name))
-                paths.append(os.path.join("./", fig_folder_safe, rand_name))
-            return paths
+                    name = figure_digest(fig)[:16] + ".pdf"
+                elif isinstance(fig, FigureGrid):
+                    name = grid_digest(fig)[:16] + ".pdf"
+                else:
+                    name = canvas_digest(fig)[:16] + ".pdf"
+                path = os.path.join("./", fig_folder_safe, name)
+                if os.path.exists(os.path.join(fig_path_from_latex_root, name)):
+                    tasks.append((path, None))
+                else:
+                    tasks.append((path, functools.partial(_write_figure_to_disc, fig, fig_path_from_latex_root,
+                                                          name, path)))
+            return tasks
 
     def add_section(self, sec_title):
         self.sections.append(self.Section(self, sec_title=sec_title))
         return self.sections[-1]
 
-    def _create_latex_and_save_figures(self):
+    def _write_figures_to_disc(self, jobs=None):
+        """
+        Write the figures of all sections to disc. Figures which are
+        already on disc are skipped and files of figures which are no
+        longer part of the document are deleted.
+
+        Parameters
+        ----------
+        jobs : int
+            Number of worker processes; `None` or 1 writes the figures in this process
+
+        Returns
+        -------
+        list :
+            One list of paths per section, relative to where the tex
+            file will be; `None` for figures which failed
+        int :
+            Number of files which were actually written; identical
+            figures share one file
+        """
+        paths = [[] for sec in self.sections]
+        # owners[i] are the (section, figure) indices written by tasks[i]
+        tasks, owners = [], []
+        task_of_path = {}
+        for sec_idx, sec in enumerate(self.sections):
+            for idx, (path, task) in enumerate(sec._figure_tasks()):
+                paths[sec_idx].append(path)
+                if task is None:
+                    continue
+                # identical figures have the same file; write it only once
+                key = os.path.normpath(path)
+                if key in task_of_path:
+                    owners[task_of_path[key]].append((sec_idx, idx))
+                    continue
+                task_of_path[key] = len(tasks)
+                tasks.append(task)
+                owners.append([(sec_idx, idx)])
+        if jobs is not None and jobs > 1:
+            results = _run_tasks(tasks, workers=jobs)
+        else:
+            results = []
+            for task in tasks:
+                try:
+                    results.append((True, task(), None))
+                except Exception as e:
+                    results.append((False, None, "{0}: {1}".format(type(e).__name__, e)))
+        for task_owners, (success, path, error) in zip(owners, results):
+            if success:
+                continue
+            for sec_idx, idx in task_owners:
+                log.error("Figure {0} of section '{1}' failed: {2}".format(idx, self.sections[sec_idx].title, error))
+                paths[sec_idx][idx] = None
+        self._delete_stale_figures(paths)
+        return paths, len(tasks)
+
+    def _delete_stale_figures(self, paths):
+        """
+        Delete files in the figure folders which are not among the given paths
+        """
+        fig_root = os.path.join(self.output_dir, 'figures')
+        keep = set(os.path.normpath(os.path.join(self.output_dir, p))
+                   for sec_paths in paths for p in sec_paths if p is not None)
+        for dirpath, dirnames, filenames in os.walk(fig_root, topdown=False):
+            for fname in filenames:
+                fpath = os.path.normpath(os.path.join(dirpath, fname))
+                if fpath not in keep:
+                    log.debug("Deleting stale figure {0}".format(fpath))
+                    os.remove(fpath)
+            if dirpath != fig_root and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+
+    def _create_latex_and_save_figures(self, jobs=None):
+        """
+        Returns
+        -------
+        string :
+            The latex document
+        int :
+            Number of figures which were written to disc
+        """
         body = ''
         body += self.preamble.format(title=self.title, author=self.author)
-        for sec in self.sections:
-            body += sec._make_section_body()
+        paths, nwritten = self._write_figures_to_disc(jobs=jobs)
+        for sec, fig_paths in zip(self.sections, paths):
+            body += sec._make_section_body(fig_paths)
         body += self.postamble
-        return body
+        return body, nwritten
 
-    def finalize_document(self, output_file_name="summary.tex"):
+    def finalize_document(self, output_file_name="summary.tex", jobs=None):
         """
-        Assamble the latex document and run the compile command
+        Assamble the latex document and run the compile command.
+
+        Only figures which changed are written and `pdflatex` is
+        skipped if neither the document nor any figure changed since
+        the last build. The second `pdflatex` pass is only run if the
+        first one changed the auxiliary files (.aux, .toc, ...).
+
+        Parameters
+        ----------
+        output_file_name : string
+            Name of the tex file within `output_dir`
+        jobs : int
+            Number of processes used to write the figures of all sections
         """
+        output_dir = os.path.abspath(self.output_dir)
         try:
-            os.makedirs(self.output_dir)
+            os.makedirs(output_dir)
         except OSError:
             pass
 
-        with file(os.path.abspath(self.output_dir) + "/" + output_file_name, 'w')as f:
-            f.write(self._create_latex_and_save_figures())
+        tex_path = os.path.join(output_dir, output_file_name)
+        body, nwritten = self._create_latex_and_save_figures(jobs=jobs)
+        try:
+            with open(tex_path) as f:
+                tex_changed = f.read() != body
+        except IOError:
+            tex_changed = True
+        if tex_changed:
+            with open(tex_path, 'w') as f:
+                f.write(body)
+
+        basename = os.path.splitext(tex_path)[0]
+        if not tex_changed and nwritten == 0 and os.path.exists(basename + '.pdf'):
+            log.info("{0} is up to date".format(output_file_name))
+            return
 
+        aux_files = [basename + ext for ext in ('.aux', '.toc', '.nav', '.snm', '.out')]
+        aux_before = [_file_digest(path) for path in aux_files]
         cmd = ['pdflatex', '-file-line-error', '-interaction=nonstopmode', format(output_file_name)]
-        check_output(cmd, cwd=os.path.abspath(self.output_dir))
+        check_output(cmd, cwd=output_dir)
+        if aux_before == [_file_digest(path) for path in aux_files]:
+            return
         try:
             # only cache errors for the second compiling try, since the first  might complain about old stuff
-            check_output(cmd, cwd=os.path.abspath(self.output_dir))
+            check_output(cmd, cwd=output_dir)
         except subprocess.CalledProcessError:
             print "An error occured while compiling the latex document. See 'summary.log' for details"
 
@@ -0,0 +1,313 @@
+"""
+Content addressed on-disk cache for rendered figures.
+
+A figure is identified by a hash of everything which influences how it
+looks: The data of its plottables, their per-plottable options, the
+style, the palette and all `Figure`, `Figure.Plot` and `Figure.Legend`
+settings. If a figure with the same hash was rendered before, the
+cached file is copied instead of drawing the figure again.
+
+The cache is opt-in; enable it for all figures with
+
+    Figure.render_cache = RenderCache('~/.roofie_cache')
+
+or for a single figure by setting the attribute on the instance.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from ._root import ROOT
+
+from .arrays import hist_edges, hist_contents, hist_errors, graph_arrays, function_parameters
+
+# Bump if the way figures are drawn changes so that old cache entries become invalid
+_DIGEST_VERSION = 3
+
+
+def _settings(obj):
+    """
+    Public, non-callable attributes of `obj` (incl. inherited ones) as sorted (name, repr) pairs
+    """
+    settings = []
+    for name in sorted(dir(obj)):
+        if name.startswith('_'):
+            continue
+        value = getattr(obj, name)
+        if callable(value):
+            continue
+        settings.append((name, repr(value)))
+    return settings
+
+
+def _update(digest, value):
+    if isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode('utf-8'))
+        digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode('utf-8'))
+
+
+def _update_data(digest, obj):
+    """
+    Feed the type and the data of `obj` to `digest`
+    """
+    _update(digest, type(obj).__name__)
+    if isinstance(obj, ROOT.TH1):
+        _update(digest, hist_edges(obj))
+        _update(digest, hist_contents(obj))
+        for err in hist_errors(obj):
+            _update(digest, err)
+    elif isinstance(obj, ROOT.TGraph):
+        for arr in graph_arrays(obj):
+            _update(digest, arr)
+    elif isinstance(obj, ROOT.TF1):
+        _update(digest, (obj.GetTitle(), obj.GetExpFormula().Data(), obj.GetXmin(), obj.GetXmax(), obj.GetNpx()))
+        _update(digest, function_parameters(obj))
+
+
+def _update_axis(digest, axis):
+    """
+    Feed the settings of `axis` which are neither themed nor changed when drawing to `digest`
+    """
+    labels = axis.GetLabels()
+    _update(digest, (axis.GetNdivisions(), axis.GetLabelOffset(), axis.GetLabelColor(), axis.GetAxisColor(),
+                     axis.GetTitleColor(), axis.GetTickLength(), axis.GetMoreLogLabels(), axis.GetNoExponent(),
+                     axis.GetTimeDisplay(), axis.GetTimeFormat(),
+                     [label.GetName() for label in labels] if labels else None))
+
+
+def _update_record(digest, rec):
+    """
+    Feed a plottable of a figure to `digest`, including those attributes
+    which `Figure._theme_plottables` does not overwrite. Attributes which
+    are themed change with every draw and must be left out.
+    """
+    _update(digest, (rec.legend_title, rec.markerstyle, rec.linestyle, rec.color, rec.use_as_frame))
+    obj = rec.p
+    _update_data(digest, obj)
+    # the colors are always themed
+    if isinstance(obj, ROOT.TAttFill):
+        _update(digest, obj.GetFillStyle())
+    if isinstance(obj, ROOT.TAttLine):
+        _update(digest, (obj.GetLineWidth(), None if rec.linestyle else obj.GetLineStyle()))
+    if isinstance(obj, ROOT.TAttMarker) and not rec.markerstyle:
+        _update(digest, (obj.GetMarkerStyle(), obj.GetMarkerSize()))
+    if isinstance(obj, (ROOT.TH1, ROOT.TGraph, ROOT.TF1)):
+        for axis in (obj.GetXaxis(), obj.GetYaxis()):
+            _update_axis(digest, axis)
+
+
+def figure_digest(fig):
+    """
+    Hash of everything which determines the look of the given figure
+
+    Returns
+    -------
+    string :
+        Hex digest
+    """
+    digest = hashlib.sha1()
+    _update(digest, _DIGEST_VERSION)
+    _update(digest, (fig.title, fig.xtitle, fig.ytitle))
+    _update(digest, fig.style.__name__)
+    _update(digest, _settings(fig.style))
+    _update(digest, _settings(fig.plot))
+    _update(digest, _settings(fig.legend))
+    for rec in fig._plottables:
+        _update_record(digest, rec)
+    return digest.hexdigest()
+
+
+def grid_digest(grid):
+    """
+    Hash of everything which determines the look of the given `FigureGrid`
+    """
+    digest = hashlib.sha1()
+    _update(digest, _DIGEST_VERSION)
+    _update(digest, (grid.nrows, grid.ncols, grid.sharex, grid.sharey))
+    _update(digest, grid.style.__name__)
+    _update(digest, _settings(grid.style))
+    for pos in sorted(grid.figures):
+        _update(digest, (pos, figure_digest(grid.figures[pos])))
+    return digest.hexdigest()
+
+
+def _update_pad(digest, pad):
+    """
+    Feed the settings and primitives of `pad` (recursively) to `digest`
+    """
+    _update(digest, (pad.GetWw(), pad.GetWh(), pad.GetLogx(), pad.GetLogy(), pad.GetLogz(),
+                     pad.GetGridx(), pad.GetGridy()))
+    for prim in pad.GetListOfPrimitives():
+        if isinstance(prim, ROOT.TPad):
+            _update_pad(digest, prim)
+            continue
+        _update_data(digest, prim)
+        _update(digest, prim.GetTitle())
+        if isinstance(prim, ROOT.TAttFill):
+            _update(digest, (prim.GetFillColor(), prim.GetFillStyle()))
+        if isinstance(prim, ROOT.TAttLine):
+            _update(digest, (prim.GetLineColor(), prim.GetLineStyle(), prim.GetLineWidth()))
+        if isinstance(prim, ROOT.TAttMarker):
+            _update(digest, (prim.GetMarkerColor(), prim.GetMarkerStyle(), prim.GetMarkerSize()))
+        if isinstance(prim, ROOT.TText):
+            _update(digest, (prim.GetX(), prim.GetY()))
+        if isinstance(prim, ROOT.TLegend):
+            _update(digest, [entry.GetLabel() for entry in prim.GetListOfPrimitives()])
+
+
+def canvas_digest(canvas):
+    """
+    Hash of the content of a plain TCanvas, not created by roofie
+
+    Returns
+    -------
+    string :
+        Hex digest
+    """
+    digest = hashlib.sha1()
+    _update(digest, _DIGEST_VERSION)
+    _update_pad(digest, canvas)
+    return digest.hexdigest()
+
+
+class RenderCache(object):
+    """
+    Directory of rendered figures with a size limit and LRU eviction.
+
+    Parameters
+    ----------
+    directory : string
+        Where the cached files are stored; created if needed
+    max_bytes : int
+        Once the cache grows larger than this, the least recently used files are deleted
+
+    Attributes
+    ----------
+    hits, misses, evictions : int
+        Counters since the creation of this object (in this process)
+    """
+    def __init__(self, directory, max_bytes=512 * 1024 ** 2):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._nbytes = None
+        try:
+            os.makedirs(self.directory)
+        except OSError:
+            pass
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, "{0}.{1}".format(key, ext))
+
+    def _entries(self):
+        entries = []
+        for fname in os.listdir(self.directory):
+            path = os.path.join(self.directory, fname)
+            try:
+                stat = os.stat(path)
+            except OSError:  # removed by somebody else in the meantime
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def nbytes(self):
+        """
+        Current size of the cache on disc
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def lookup(self, key, ext):
+        """
+        Path of the cached file for `key` or `None` if there is none.
+        Counts as a hit or miss and marks the entry as recently used.
+        """
+        path = self._path(key, ext)
+        try:
+            # the mtime keeps track of the last usage
+            os.utime(path, None)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def fetch(self, key, ext, dest):
+        """
+        Copy the cached file for `key` to `dest`
+
+        Returns
+        -------
+        bool :
+            True if the entry existed
+        """
+        path = self.lookup(key, ext)
+        if path is None:
+            return False
+        try:
+            shutil.copyfile(path, dest)
+        except (IOError, OSError):
+            # evicted by another process between lookup and copy
+            self.hits -= 1
+            self.misses += 1
+            return False
+        return True
+
+    def store(self, key, ext, src):
+        """
+        Put a copy of the file `src` into the cache under `key`
+        """
+        # copy and rename so that concurrent readers never see half written files
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp')
+        os.close(fd)
+        shutil.copyfile(src, tmp)
+        path = self._path(key, ext)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        os.rename(tmp, path)
+        if self._nbytes is None:
+            self._nbytes = self.nbytes()
+        else:
+            self._nbytes += os.path.getsize(path) - replaced
+        if self._nbytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        self._nbytes = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._nbytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._nbytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Delete all cached files
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._nbytes = 0
+
+    def stats(self):
+        """
+        Counters and current size of this cache as a dict
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self._entries()), 'bytes': self.nbytes()}
@@ -0,0 +1,158 @@
+"""
+Client of the roofie render server (see `roofie.server`).
+
+Submitting figures needs neither ROOT nor rootpy; only specs (see
+`roofie.spec`) are sent to the server, which draws and writes them:
+
+    from roofie.client import RenderClient
+    from roofie.spec import hist_spec
+
+    spec = {'version': 1, 'xtitle': 'x', 'ytitle': 'counts',
+            'plottables': [hist_spec(edges, counts, legend_title='data')]}
+    paths = RenderClient().render(spec, 'plots', 'counts', formats=['pdf', 'png'])
+
+Protocol: each message is a 4 byte big-endian length followed by the
+message in the binary format of `roofie.spec.dumps`. Requests have an
+`op` ('render', 'ping' or 'shutdown'); each request gets one response
+with `ok` and either the result or `error`.
+"""
+
+import os
+import socket
+import struct
+
+from .spec import dumps, loads
+
+_HEADER = struct.Struct('>I')
+
+
+def default_socket_path():
+    """
+    `$ROOFIE_SOCKET`, or a per-user socket in `$XDG_RUNTIME_DIR` or /tmp
+    """
+    if os.environ.get('ROOFIE_SOCKET'):
+        return os.environ['ROOFIE_SOCKET']
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'roofie.sock')
+    return '/tmp/roofie-{0}.sock'.format(os.getuid())
+
+
+def _recv_exactly(sock, n):
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            raise EOFError("Connection closed")
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_message(sock, msg):
+    data = dumps(msg)
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def recv_message(sock):
+    """
+    Receive one message; raises `EOFError` if the connection was closed before
+    """
+    n, = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    return loads(_recv_exactly(sock, n))
+
+
+class RenderClient(object):
+    """
+    Connection to a running render server
+
+    Parameters
+    ----------
+    socket_path : string
+        Defaults to `default_socket_path()`
+    timeout : float
+        Seconds to wait for each response; `None` waits forever
+    """
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+        self._sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _request(self, msg):
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(self.timeout)
+            try:
+                self._sock.connect(self.socket_path)
+            except socket.error:
+                self.close()
+                raise
+        try:
+            send_message(self._sock, msg)
+            response = recv_message(self._sock)
+        except (socket.error, EOFError):
+            # the server may have gone; reconnect on the next request
+            self.close()
+            raise
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+        return response
+
+    def render(self, spec, path, name, formats=('pdf', ), dpi=None):
+        """
+        Let the server draw the figure `spec` and write it like `Figure.export`.
+        `spec` is a spec dict or the output of `Figure.to_spec`.
+
+        Returns
+        -------
+        list :
+            Paths of the written files
+
+        Raises
+        ------
+        RuntimeError :
+            If the server could not render the figure
+        """
+        # relative paths are relative to the client, not the server
+        path = os.path.abspath(path)
+        if not isinstance(spec, dict):
+            spec = loads(spec)
+        return list(self._request({'op': 'render', 'spec': spec, 'path': path, 'name': name,
+                                   'formats': list(formats), 'dpi': dpi})['paths'])
+
+    def ping(self):
+        """
+        Versions of the server's python and ROOT as a dict
+        """
+        response = self._request({'op': 'ping'})
+        return {'python': response['python'], 'root': response['root']}
+
+    def shutdown(self):
+        """
+        Stop the server after this request
+        """
+        self._request({'op': 'shutdown'})
+        self.close()
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+def server_running(socket_path=None):
+    """
+    True if a render server answers at `socket_path`
+    """
+    try:
+        with RenderClient(socket_path, timeout=5) as client:
+            client.ping()
+    except (socket.error, EOFError, RuntimeError):
+        return False
+    return True
@@ -0,0 +1,331 @@
+"""
+Vectorized HUSL colour space conversions, palettes and colormaps.
+
+The conversions follow `roofie.external.husl` but work on NumPy arrays
+whose last axis holds the three components of each colour, eg. an
+array of shape (n, 3) for n colours:
+
+    rgb = husl_to_rgb([[0, 90, 65], [120, 90, 65]])
+
+Ranges: RGB in [0, 1], HUSL (hue, saturation, lightness) in [0, 360],
+[0, 100] and [0, 100] and LCH/LUV lightness in [0, 100].
+"""
+
+import numpy as np
+
+from ._root import ROOT
+
+_M = np.array([
+    [3.2406, -1.5372, -0.4986],
+    [-0.9689, 1.8758, 0.0415],
+    [0.0557, -0.2040, 1.0570],
+])
+
+_M_INV = np.array([
+    [0.4124, 0.3576, 0.1805],
+    [0.2126, 0.7152, 0.0722],
+    [0.0193, 0.1192, 0.9505],
+])
+
+# Hard-coded D65 illuminant
+_REF_Y = 1.00000
+_REF_U = 0.19784
+_REF_V = 0.46834
+_LAB_E = 0.008856
+_LAB_K = 903.3
+
+# Continuous colormaps as control points (position, hue, saturation,
+# lightness) in HUSL space which are interpolated linearly. Lightness
+# changes linearly (in each half of the diverging map) so that equal
+# steps in the data look like equal steps in colour.
+COLORMAPS = {
+    'sequential': [(0., 265., 90., 15.), (1., 60., 90., 95.)],
+    'blues': [(0., 250., 90., 15.), (1., 250., 90., 97.)],
+    'reds': [(0., 12., 90., 15.), (1., 12., 90., 97.)],
+    'greys': [(0., 0., 0., 10.), (1., 0., 0., 97.)],
+    # the hue jumps at the white center instead of passing through green
+    'diverging': [(0., 250., 90., 35.), (.5, 250., 0., 97.), (.5, 12., 0., 97.), (1., 12., 90., 35.)],
+}
+
+_PALETTE_CACHE = {}
+_COLORMAP_CACHE = {}
+# (name, ncontours, alpha) -> index of the first colour of the gradient in ROOT's colour table
+_ROOT_PALETTES = {}
+
+
+def _components(arr):
+    arr = np.asarray(arr, dtype=np.float64)
+    if arr.shape[-1:] != (3, ):
+        raise ValueError("The last axis must hold the 3 components of a colour, got shape {0}".format(arr.shape))
+    return arr[..., 0], arr[..., 1], arr[..., 2]
+
+
+def max_chroma(L, H):
+    """
+    Largest chroma within the RGB gamut for the given lightness and hue (in degrees)
+    """
+    L, H = np.broadcast_arrays(np.asarray(L, dtype=np.float64), np.asarray(H, dtype=np.float64))
+    hrad = np.radians(H)
+    sinH, cosH = np.sin(hrad), np.cos(hrad)
+    sub1 = (L + 16) ** 3 / 1560896.0
+    sub2 = np.where(sub1 > 0.008856, sub1, L / 903.3)
+    result = np.full(L.shape, np.inf)
+    for m1, m2, m3 in _M:
+        top = (0.99915 * m1 + 1.05122 * m2 + 1.14460 * m3) * sub2
+        rbottom = 0.86330 * m3 - 0.17266 * m2
+        lbottom = 0.12949 * m3 - 0.38848 * m1
+        bottom = (rbottom * sinH + lbottom * cosH) * sub2
+        for t in (0.0, 1.0):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                C = L * (top - 1.05122 * t) / (bottom + 0.17266 * sinH * t)
+            result = np.where((C > 0) & (C < result), C, result)
+    return result
+
+
+def _f(t):
+    with np.errstate(invalid='ignore'):
+        return np.where(t > _LAB_E, np.power(t, 1.0 / 3.0), 7.787 * t + 16.0 / 116.0)
+
+
+def _f_inv(t):
+    return np.where(t ** 3 > _LAB_E, t ** 3, (116.0 * t - 16.0) / _LAB_K)
+
+
+def _from_linear(c):
+    with np.errstate(invalid='ignore'):
+        return np.where(c <= 0.0031308, 12.92 * c, 1.055 * np.power(c, 1.0 / 2.4) - 0.055)
+
+
+def _to_linear(c):
+    return np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+
+
+def xyz_to_rgb(xyz):
+    xyz = np.asarray(xyz, dtype=np.float64)
+    return _from_linear(xyz.dot(_M.T))
+
+
+def rgb_to_xyz(rgb):
+    return _to_linear(np.asarray(rgb, dtype=np.float64)).dot(_M_INV.T)
+
+
+def xyz_to_luv(xyz):
+    X, Y, Z = _components(xyz)
+    denom = X + 15.0 * Y + 3.0 * Z
+    L = 116.0 * _f(Y / _REF_Y) - 16.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        U = 13.0 * L * (4.0 * X / denom - _REF_U)
+        V = 13.0 * L * (9.0 * Y / denom - _REF_V)
+    luv = np.stack([L, U, V], axis=-1)
+    # black would divide by zero
+    luv[(denom == 0) | (L == 0)] = 0
+    return luv
+
+
+def luv_to_xyz(luv):
+    L, U, V = _components(luv)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Y = _f_inv((L + 16.0) / 116.0) * _REF_Y
+        varU = U / (13.0 * L) + _REF_U
+        varV = V / (13.0 * L) + _REF_V
+        X = 0.0 - (9.0 * Y * varU) / ((varU - 4.0) * varV - varU * varV)
+        Z = (9.0 * Y - (15.0 * varV * Y) - (varV * X)) / (3.0 * varV)
+    xyz = np.stack([X, Y, Z], axis=-1)
+    xyz[L == 0] = 0
+    return xyz
+
+
+def luv_to_lch(luv):
+    L, U, V = _components(luv)
+    H = np.degrees(np.arctan2(V, U))
+    return np.stack([L, np.hypot(U, V), np.where(H < 0, H + 360.0, H)], axis=-1)
+
+
+def lch_to_luv(lch):
+    L, C, H = _components(lch)
+    hrad = np.radians(H)
+    return np.stack([L, np.cos(hrad) * C, np.sin(hrad) * C], axis=-1)
+
+
+def husl_to_lch(husl):
+    H, S, L = _components(husl)
+    C = max_chroma(L, H) / 100.0 * S
+    white, black = L > 99.9999999, L < 0.00000001
+    L = np.where(white, 100.0, np.where(black, 0.0, L))
+    C = np.where(white | black, 0.0, C)
+    return np.stack([L, C, H], axis=-1)
+
+
+def lch_to_husl(lch):
+    L, C, H = _components(lch)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        S = C / max_chroma(L, H) * 100.0
+    white, black = L > 99.9999999, L < 0.00000001
+    L = np.where(white, 100.0, np.where(black, 0.0, L))
+    S = np.where(white | black, 0.0, S)
+    return np.stack([H, S, L], axis=-1)
+
+
+def lch_to_rgb(lch):
+    return xyz_to_rgb(luv_to_xyz(lch_to_luv(lch)))
+
+
+def rgb_to_lch(rgb):
+    return luv_to_lch(xyz_to_luv(rgb_to_xyz(rgb)))
+
+
+def husl_to_rgb(husl):
+    return lch_to_rgb(husl_to_lch(husl))
+
+
+def rgb_to_husl(rgb):
+    return lch_to_husl(rgb_to_lch(rgb))
+
+
+def husl_palette(ncolors=6, h=.01, s=.9, l=.65):
+    """
+    Evenly spaced hues in HUSL space; same parameters as seaborn's `husl_palette`.
+    Palettes are cached per set of parameters.
+
+    Parameters
+    ----------
+    ncolors : int
+        Number of colours in the palette
+    h : float
+        First hue in [0, 1]
+    s : float
+        Saturation in [0, 1]
+    l : float
+        Lightness in [0, 1]
+
+    Returns
+    -------
+    tuple :
+        RGB tuples
+    """
+    key = (ncolors, h, s, l)
+    try:
+        return _PALETTE_CACHE[key]
+    except KeyError:
+        pass
+    hues = (np.linspace(0, 1, ncolors + 1)[:-1] + h) % 1 * 359
+    husl = np.column_stack([hues, np.full(ncolors, s * 99), np.full(ncolors, l * 99)])
+    rgb = np.clip(husl_to_rgb(husl), 0, 1)
+    palette = tuple(tuple(float(c) for c in color) for color in rgb)
+    _PALETTE_CACHE[key] = palette
+    return palette
+
+
+def colormap(name, n=256):
+    """
+    Sample the continuous colormap `name` (see `COLORMAPS`) at `n` equidistant points
+
+    Returns
+    -------
+    array :
+        Read-only array of shape (n, 3) with RGB values
+    """
+    key = (name, n)
+    try:
+        return _COLORMAP_CACHE[key]
+    except KeyError:
+        pass
+    try:
+        points = np.array(COLORMAPS[name], dtype=np.float64)
+    except KeyError:
+        raise ValueError("Unknown colormap '{0}'".format(name))
+    t = np.linspace(0, 1, n)
+    husl = np.column_stack([np.interp(t, points[:, 0], points[:, i]) for i in (1, 2, 3)])
+    rgb = np.clip(husl_to_rgb(husl), 0, 1)
+    rgb.flags.writeable = False
+    _COLORMAP_CACHE[key] = rgb
+    return rgb
+
+
+def set_root_palette(name, ncontours=255, alpha=1.0):
+    """
+    Install the colormap `name` as ROOT's palette for 2D plots (eg. 'colz').
+
+    The gradient is only created in ROOT's colour table the first time;
+    later calls with the same arguments reuse its colours.
+
+    Returns
+    -------
+    int :
+        Index of the first colour of the palette
+    """
+    key = (name, ncontours, alpha)
+    first = _ROOT_PALETTES.get(key)
+    if first is None:
+        # ROOT interpolates linearly in RGB between the stops, so use plenty of them
+        rgb = colormap(name, 32)
+        stops = np.linspace(0, 1, len(rgb))
+        red, green, blue = [np.ascontiguousarray(rgb[:, i]) for i in range(3)]
+        first = ROOT.TColor.CreateGradientColorTable(len(stops), stops, red, green, blue, ncontours, alpha)
+        if first < 0:
+            raise ValueError("ROOT could not create the colormap '{0}'".format(name))
+        _ROOT_PALETTES[key] = first
+    else:
+        ROOT.gStyle.SetPalette(ncontours, np.arange(first, first + ncontours, dtype=np.int32))
+    ROOT.gStyle.SetNumberContours(ncontours)
+    return first
+
+
+class ColorRegistry(object):
+    """
+    Process-wide map of RGB(A) values to ROOT colour indices, so that
+    each colour is only looked up in (or added to) ROOT's colour table once.
+
+    Attributes
+    ----------
+    hits, misses : int
+        Lookups which were answered from the registry and the ones which needed ROOT
+    """
+    def __init__(self):
+        self._indices = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._indices)
+
+    def index(self, color):
+        """
+        ROOT colour index of `color`
+
+        Parameters
+        ----------
+        color : int, tuple
+            A colour index, which is returned as is, or an (r, g, b) or
+            (r, g, b, alpha) tuple with values in [0, 1]
+        """
+        if isinstance(color, (int, np.integer)):
+            return int(color)
+        # 8 bit per channel is all ROOT keeps anyways
+        key = tuple(int(round(float(c) * 255)) for c in color)
+        try:
+            idx = self._indices[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return idx
+        self.misses += 1
+        if len(key) not in (3, 4):
+            raise ValueError("Expected an (r, g, b) or (r, g, b, alpha) tuple, got {0}".format(color))
+        # `GetColor` reuses an existing colour with the same RGB values
+        idx = ROOT.TColor.GetColor(key[0], key[1], key[2])
+        if len(key) == 4 and key[3] != 255:
+            idx = ROOT.TColor.GetColorTransparent(idx, key[3] / 255.0)
+        self._indices[key] = idx
+        return idx
+
+    def stats(self):
+        """
+        Size and hit statistics of the registry and the size of ROOT's colour table as a dict
+        """
+        return {'size': len(self), 'hits': self.hits, 'misses': self.misses,
+                'root_colors': ROOT.gROOT.GetListOfColors().GetSize()}
+
+
+color_registry = ColorRegistry()
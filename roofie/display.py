@@ -0,0 +1,230 @@
+"""
+Reduce plottables to what can actually be seen at the resolution of the figure.
+
+The reduced objects are copies which are only used for drawing; the
+plottables of a figure are never modified. All reductions work in
+"display space", i.e. with the logarithm of the coordinates on
+logarithmic axes, and on the pixel grid of the plot's frame.
+"""
+
+import numpy as np
+
+from ._root import ROOT, asrootpy
+from .arrays import graph_arrays, hist_edges, hist_contents, hist_errors
+
+# Width of the pad holding a seperate legend as a fraction of the canvas
+_SEPERATE_LEGEND_WIDTH = .2
+
+DECIMATION_METHODS = ('pixels', 'minmax', 'lttb')
+
+
+def frame_size_px(fig):
+    """
+    Size of the frame of the given figure's plot in pixels, taking
+    `Figure.Plot.display_oversampling` into account
+
+    Returns
+    -------
+    tuple :
+        (width, height)
+    """
+    left, right, bottom, top = fig.style.plot_margins
+    pad_width = 1 - _SEPERATE_LEGEND_WIDTH if fig.legend.position == 'seperate' else 1
+    oversampling = fig.plot.display_oversampling
+    width = fig.style.canvasWidth * pad_width * (1 - left - right) * oversampling
+    height = fig.style.canvasHeight * (1 - bottom - top) * oversampling
+    return max(1, int(round(width))), max(1, int(round(height)))
+
+
+def _to_display(values, vmin, vmax, log, npixels):
+    """
+    Map `values` onto the pixel grid [0, npixels) of an axis; values
+    outside of the axis end up in the pixels -1 and `npixels`.
+    """
+    if log:
+        # non-positive values are to the left of (or below) the axis
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(values > 0, np.log10(values), -np.inf)
+        vmin, vmax = np.log10(vmin), np.log10(vmax)
+    pos = (values - vmin) / (vmax - vmin) * npixels
+    return pos, np.clip(np.floor(pos), -1, npixels).astype(np.int64)
+
+
+def _pixels(col, row):
+    """
+    Indices of the first point in each occupied pixel
+    """
+    ncols = col.max() + 2
+    _, idx = np.unique((row + 1) * ncols + (col + 1), return_index=True)
+    return np.sort(idx)
+
+
+def _minmax(col, y):
+    """
+    Indices of the lowest and highest point of each pixel column
+    """
+    order = np.lexsort((y, col))
+    col_sorted = col[order]
+    bounds = np.flatnonzero(np.diff(col_sorted)) + 1
+    starts = np.concatenate([[0], bounds])
+    ends = np.concatenate([bounds - 1, [len(order) - 1]])
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+
+def _lttb(x, y, nout):
+    """
+    Largest-Triangle-Three-Buckets downsampling of the points (x, y)
+    which are sorted in x
+
+    Returns
+    -------
+    array :
+        Indices of the `nout` selected points
+    """
+    n = len(x)
+    if nout >= n or nout < 3:
+        return np.arange(n)
+    bounds = np.linspace(1, n - 1, nout - 1).astype(np.int64)
+    idx = np.empty(nout, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(nout - 2):
+        start, stop = bounds[i], bounds[i + 1]
+        next_stop = bounds[i + 2] if i + 2 < len(bounds) else n
+        avg_x, avg_y = x[stop:next_stop].mean(), y[stop:next_stop].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def _copy_attributes(src, dest):
+    for att in (ROOT.TAttLine, ROOT.TAttFill, ROOT.TAttMarker):
+        if isinstance(src, att):
+            att.Copy(src, dest)
+    dest.SetTitle(src.GetTitle())
+
+
+def decimate_graph(g, method, ranges, logs, size):
+    """
+    Reduce the points of the TGraph `g` to those needed to draw it at the given resolution.
+
+    Parameters
+    ----------
+    g : TGraph
+        Graph to be reduced; it is not modified
+    method : string
+        'pixels' keeps the first point in each occupied pixel which
+        looks identical for markers. 'minmax' keeps the lowest and
+        highest point of each pixel column and 'lttb' uses the
+        Largest-Triangle-Three-Buckets algorithm with one point per
+        column; both are meant for lines.
+    ranges : tuple
+        (xmin, xmax, ymin, ymax) of the frame
+    logs : tuple
+        (logx, logy)
+    size : tuple
+        (width, height) of the frame in pixels
+
+    Returns
+    -------
+    TGraph :
+        A reduced copy or `g` itself if no reduction is possible
+    """
+    if method not in DECIMATION_METHODS:
+        raise ValueError("Unknown decimation method '{0}'".format(method))
+    width, height = size
+    n = g.GetN()
+    if n <= 2 * width:
+        return g
+    x, y, exl, exh, eyl, eyh = graph_arrays(g)
+    # points which cannot be shown on a logarithmic axis are dropped
+    keep = np.ones(n, dtype=bool)
+    if logs[0]:
+        keep &= x > 0
+    if logs[1]:
+        keep &= y > 0
+    candidates = np.flatnonzero(keep)
+    if candidates.size == 0:
+        # nothing of the graph is visible; ROOT can deal with that
+        return g
+    xpos, col = _to_display(x[candidates], ranges[0], ranges[1], logs[0], width)
+    ypos, row = _to_display(y[candidates], ranges[2], ranges[3], logs[1], height)
+    if method == 'pixels':
+        idx = _pixels(col, row)
+    elif method == 'minmax':
+        idx = _minmax(col, ypos)
+    else:
+        order = np.argsort(xpos, kind='mergesort')
+        idx = np.sort(order[_lttb(xpos[order], ypos[order], width)])
+    idx = candidates[idx]
+    if len(idx) >= n:
+        return g
+    arrays = [np.ascontiguousarray(arr[idx]) for arr in (x, y, exl, exh, eyl, eyh)]
+    if isinstance(g, ROOT.TGraphAsymmErrors):
+        reduced = ROOT.TGraphAsymmErrors(len(idx), *arrays)
+    elif isinstance(g, ROOT.TGraphErrors):
+        reduced = ROOT.TGraphErrors(len(idx), arrays[0], arrays[1], arrays[2], arrays[4])
+    else:
+        reduced = ROOT.TGraph(len(idx), arrays[0], arrays[1])
+    _copy_attributes(g, reduced)
+    reduced.SetName(g.GetName() + "_decimated")
+    return asrootpy(reduced)
+
+
+def rebin_hist(h, xrange, logx, width):
+    """
+    Merge the bins of the TH1 `h` which are visible within `xrange`
+    such that no output bin is narrower than one pixel column.
+
+    Contents are summed and errors are added in quadrature. Bins
+    outside of `xrange` are dropped.
+
+    Parameters
+    ----------
+    h : TH1
+        Histogram to be reduced; it is not modified
+    xrange : tuple
+        (xmin, xmax) of the frame
+    logx : bool
+        If the x-axis is logarithmic
+    width : int
+        Width of the frame in pixels
+
+    Returns
+    -------
+    TH1 :
+        A reduced copy or `h` itself if no reduction is needed
+    """
+    if h.GetDimension() != 1 or isinstance(h, ROOT.TProfile):
+        return h
+    edges = hist_edges(h)
+    nbins = len(edges) - 1
+    lo = max(0, np.searchsorted(edges, xrange[0], side='right') - 1)
+    hi = min(nbins, np.searchsorted(edges, xrange[1], side='left'))
+    if hi - lo <= width:
+        return h
+    edge_pos = _to_display(edges[lo:hi + 1], xrange[0], xrange[1], logx, width)[0]
+    center_pos = 0.5 * (edge_pos[:-1] + edge_pos[1:])
+    col = np.clip(np.floor(center_pos), -1, width).astype(np.int64)
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(col)) + 1])
+    new_edges = np.ascontiguousarray(np.concatenate([edges[lo + starts], [edges[hi]]]), dtype=np.float64)
+    nnew = len(starts)
+
+    # cells are shifted by one due to the underflow bin
+    contents = np.zeros(nnew + 2)
+    contents[1:-1] = np.add.reduceat(hist_contents(h)[lo + 1:hi + 1].astype(np.float64), starts)
+    reduced = ROOT.TH1D(h.GetName() + "_rebinned", h.GetTitle(), nnew, new_edges)
+    reduced.SetDirectory(0)
+    reduced.SetContent(contents)
+    if h.GetBinErrorOption() == ROOT.TH1.kNormal:
+        errors = np.zeros(nnew + 2)
+        errors[1:-1] = np.sqrt(np.add.reduceat(hist_errors(h)[1][lo + 1:hi + 1] ** 2, starts))
+        reduced.Sumw2()
+        reduced.SetError(errors)
+    else:
+        # eg. Poisson errors are computed from the (merged) contents
+        reduced.SetBinErrorOption(h.GetBinErrorOption())
+    reduced.SetEntries(h.GetEntries())
+    _copy_attributes(h, reduced)
+    return asrootpy(reduced)
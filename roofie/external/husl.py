@@ -1,6 +1,8 @@
 import operator
 import math
 
+import numpy as np
+
 __version__ = "2.1.0"
 
 
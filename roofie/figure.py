@@ -1,23 +1,26 @@
 import string
 import random
+from collections import namedtuple
+from contextlib import contextmanager
 import logging
 import os
+import tempfile
 
-from rootpy import asrootpy, log
-from rootpy.plotting import Legend, Canvas, Pad, Graph
-from rootpy.plotting.base import Color, MarkerStyle
-from rootpy.plotting.utils import get_limits
+import numpy as np
 
-from .utils import _turn_on_style
-import ROOT
+from . import background, profiling
+from .arrays import graph_from_arrays, plottable_nbytes
+from .cache import figure_digest
+from .colors import color_registry, husl_palette
+from .display import decimate_graph, rebin_hist, frame_size_px
+from .limits import get_limits
+from . import spec
+from .utils import _turn_on_style, scoped_style
+from ._root import ROOT, asrootpy, plotting
 
 # from external import husl
 
-# suppress some nonsense logging messages when writing to pdfs.
-# Also, setup default logger
-log["/ROOT.TCanvas.Print"].setLevel(log.WARNING)
-logging.basicConfig(level=logging.DEBUG)
-log = log["/roofie"]
+log = logging.getLogger("roofie")
 
 # Turn on the "style"...
 # _turn_on_style()
@@ -32,6 +35,42 @@ def is_plottable(obj):
     return isinstance(obj, (ROOT.TH1, ROOT.TGraph))
 
 
+def _address(obj):
+    """
+    Memory address of the C++ object behind `obj`
+    """
+    try:
+        return ROOT.addressof(obj)
+    except AttributeError:
+        # legacy PyROOT
+        return ROOT.AddressOf(obj)[0]
+
+
+def _legend_labels(pad):
+    """
+    Labels of all legend entries in `pad` and its sub-pads
+
+    Returns
+    -------
+    tuple :
+        (dict mapping the address of an object to its label, header of the first legend)
+    """
+    labels, header = {}, ''
+    for prim in pad.GetListOfPrimitives():
+        if isinstance(prim, ROOT.TPad):
+            sub_labels, sub_header = _legend_labels(prim)
+            for address, label in sub_labels.items():
+                labels.setdefault(address, label)
+            header = header or sub_header
+        elif isinstance(prim, ROOT.TLegend):
+            header = header or prim.GetHeader() or ''
+            for entry in prim.GetListOfPrimitives():
+                obj = entry.GetObject()
+                if obj:  # the header has no object
+                    labels.setdefault(_address(obj), entry.GetLabel())
+    return labels, header
+
+
 class Styles(object):
     # Define names of plot layouts:
     class _Default_Style(object):
@@ -69,6 +108,32 @@ class Styles(object):
         plot_ytitle_offset = 1.15
 
 
+_StyleBundle = namedtuple('_StyleBundle', ['axis', 'ytitle_offset', 'marker_size'])
+_STYLE_BUNDLES = {}
+
+
+def _style_bundle(style):
+    """
+    The attributes which the given `Styles` class sets on each
+    plottable. Bundles are created once per distinct set of values, so
+    equal bundles are identical objects.
+    """
+    key = (style, style.axisLabelSize, style.labelfont, style.titlefont, style.axisTitleSize,
+           style.plot_ytitle_offset, style.markerSizepx)
+    try:
+        return _STYLE_BUNDLES[key]
+    except KeyError:
+        pass
+    axis = (('SetLabelSize', style.axisLabelSize),
+            ('SetLabelFont', style.labelfont),
+            ('SetTitleFont', style.titlefont),
+            ('SetTitleSize', style.axisTitleSize))
+    # marker size 1 == 8 px, and never scales with canvas...
+    bundle = _StyleBundle(axis, style.plot_ytitle_offset, style.markerSizepx / 8.0)
+    _STYLE_BUNDLES[key] = bundle
+    return bundle
+
+
 def gen_random_name():
     """Generate a random name for temp hists"""
     return ''.join(random.choice(string.ascii_letters + string.digits) for _ in range(25))
@@ -106,29 +171,77 @@ def get_color_generator(palette='root', ncolors=10):
                    (0.89573241682613591, 0.76784315109252932, 0.58182240093455595),
                    (0.70196080207824707, 0.70196080207824707, 0.70196080207824707)])
     if palette == 'husl':
-        colors = [(0.9677975592919913, 0.44127456009157356, 0.5358103155058701),
-                  (0.8616090647292522, 0.536495730113334, 0.19548899031476086),
-                  (0.6804189127793346, 0.6151497514677574, 0.19405452111445337),
-                  (0.46810256823426105, 0.6699492535792404, 0.1928958739904499),
-                  (0.20125317221201128, 0.6907920815379025, 0.47966761189275336),
-                  (0.21044753832183283, 0.6773105080456748, 0.6433941168468681),
-                  (0.2197995660828324, 0.6625157876850336, 0.7732093159317209),
-                  (0.433280341176423, 0.6065273407962815, 0.9585467098271748),
-                  (0.8004936186423958, 0.47703363533737203, 0.9579547196007522),
-                  (0.962272393509669, 0.3976451968965351, 0.8008274363432775)]
+        colors = list(husl_palette(ncolors))
     if palette == 'root':
         # named colors of the ROOT TColor colorwheel are between 800 and 900, +1 to make them look better
         colors = []
-        for i in range(0, ncolors):
-            colors.append((800 + int(100.0 / ncolors) * i) + 1)
+        for i in range(0, min(ncolors, 100)):
+            colors.append((800 + int(100.0 / min(ncolors, 100)) * i) + 1)
     if colors:
         for color in colors:
             yield color
+        # fixed palettes are extended with evenly spaced hues if more colors are requested
+        for color in husl_palette(ncolors - len(colors)) if ncolors > len(colors) else ():
+            yield color
     else:
         raise ValueError("Unknonw palette")
 
 
+# File formats supported by `Figure.export`
+_EXPORT_FORMATS = ('pdf', 'png', 'svg', 'eps', 'ps', 'root')
+
+
+def _print_png(c, fname, dpi):
+    """
+    Print the canvas `c` to a png file with the given resolution
+    """
+    # ROOT writes one pixel per point of the canvas, ie. 72 dpi
+    scale = dpi / 72.0
+    if hasattr(ROOT.gStyle, 'SetImageScaling'):
+        # ROOT >= 6.24 can draw the image at a higher resolution directly
+        old_scale = ROOT.gStyle.GetImageScaling()
+        ROOT.gStyle.SetImageScaling(scale)
+        try:
+            c.Print(fname)
+        finally:
+            ROOT.gStyle.SetImageScaling(old_scale)
+    else:
+        img = ROOT.TImage.Create()
+        img.FromPad(c)
+        img.Scale(int(round(img.GetWidth() * scale)), int(round(img.GetHeight() * scale)))
+        img.WriteImage(fname)
+
+
+class _PlottableRecord(object):
+    """
+    A plottable of a figure together with its per-plottable options
+    """
+    __slots__ = ('p', 'legend_title', 'markerstyle', 'linestyle', 'color', 'use_as_frame', 'copied', 'themed')
+
+    def __init__(self, p, legend_title='', markerstyle=None, linestyle=None, color=None, use_as_frame=None,
+                 copied=True):
+        self.p = p
+        self.legend_title = legend_title
+        self.markerstyle = markerstyle
+        self.linestyle = linestyle
+        self.color = color
+        self.use_as_frame = use_as_frame
+        self.copied = copied
+        # (style bundle, title) with which `p` was themed the last time
+        self.themed = None
+
+
 class Figure(object):
+    # Optional `roofie.cache.RenderCache`; set on the class to enable it for all figures
+    render_cache = None
+    # Keep the canvas, pads and frame between draws and only update their content.
+    # Much faster when redrawing a figure in a loop, but a canvas returned by
+    # `draw_to_canvas` is only valid until the next draw of the same figure!
+    reuse_canvas = False
+    # Record a `roofie.profiling.RenderProfile` of each render in `last_render_profile`.
+    # Also done automatically while any hook is registered with `roofie.profiling.add_render_hook`
+    profile_renders = False
+
     def __init__(self):
         # User settable parameters:
         self.title = ''
@@ -139,6 +252,19 @@ class Figure(object):
 
         # Private:
         self._plottables = []
+        # indices kept up to date when adding plottables
+        self._nlegend_entries = 0
+        self._frame_record = None
+        # (layout, canvas, plot pad, legend pad) and the frame kept with `reuse_canvas`
+        self._reusable = None
+        self._reusable_frame = None
+        # objects drawn in `reuse_canvas` mode; kept alive until the next draw
+        self._drawn = []
+        # (palette, ncolors) and the resulting color indices
+        self._palette_memo = None
+        # profile of the latest render, see `profile_renders`
+        self.last_render_profile = None
+        self._profile = None
         self.style = Styles.Presentation_full
 
     class Plot(object):
@@ -149,6 +275,14 @@ class Figure(object):
         palette = 'root'
         palette_ncolors = 10
         xmin, xmax, ymin, ymax = None, None, None, None
+        # (low, high) percentiles of the data used for the automatic ranges instead of min/max; eg. (1, 99)
+        limits_percentiles = None
+        # Draw graphs with many points reduced to the resolution of the figure: 'pixels', 'minmax' or 'lttb'
+        decimate = None
+        # Merge the bins of histograms which are narrower than the resolution of the figure
+        display_rebin = False
+        # Number of display "pixels" per point of the canvas used when reducing plottables
+        display_oversampling = 2
         frame = None
 
     class Legend(object):
@@ -156,8 +290,7 @@ class Figure(object):
         position = 'tl'
 
     def _create_legend(self):
-        nentries = len([pdic['legend_title'] for pdic in self._plottables if pdic['legend_title'] != ''])
-        leg = Legend(nentries, leftmargin=0, rightmargin=0, entrysep=0.01,
+        leg = plotting.Legend(self._nlegend_entries, leftmargin=0, rightmargin=0, entrysep=0.01,
                      textsize=self.style.legendSize, textfont=43, margin=0.1, )
         if self.legend.title:
             leg.SetHeader(self.legend.title)
@@ -168,22 +301,23 @@ class Figure(object):
     def _theme_plottables(self):
         """
         Apply theming to all plottables of this figure as described in
-        the pdict dictionary. This function should be called just
+        their records. This function should be called just
         before drawing everything to the canvas.
         """
-        pdics = self._plottables
-        colors = get_color_generator(self.plot.palette, self.plot.palette_ncolors)
-        for pdic in pdics:
-            obj = pdic['p']
+        colors = iter(self._palette_indices())
+        themed = (_style_bundle(self.style), self.title)
+        bundle = themed[0]
+        for rec in self._plottables:
+            obj = rec.p
             # Marker(line)style must be present at this point
-            if pdic.get('markerstyle'):
-                obj.markerstyle = pdic['markerstyle']
-            if pdic.get('linestyle'):
-                obj.linestyle = pdic['linestyle']
+            if rec.markerstyle:
+                obj.markerstyle = rec.markerstyle
+            if rec.linestyle:
+                obj.linestyle = rec.linestyle
 
             # if color is not present, get one from the color generator
-            if pdic.get('color', None):
-                obj.color = pdic['color']
+            if rec.color:
+                obj.color = color_registry.index(rec.color) if isinstance(rec.color, (tuple, list)) else rec.color
             else:
                 try:
                     color = next(colors)
@@ -192,23 +326,37 @@ class Figure(object):
                     color = 1
                 obj.color = color
 
+            # the rest only depends on the style and title; skip it if nothing changed since the last draw
+            if rec.themed == themed:
+                continue
             # Set the title to the given title (sledge hammer method)
             obj.title = self.title
             axes = obj.GetXaxis(), obj.GetYaxis()
             for axis in axes:
-                axis.SetLabelSize(self.style.axisLabelSize)
-                axis.SetLabelFont(self.style.labelfont)
-                axis.SetTitleFont(self.style.titlefont)
-                axis.SetTitleSize(self.style.axisTitleSize)
+                for setter, value in bundle.axis:
+                    getattr(axis, setter)(value)
             # yaxis only settings:
-            axes[1].SetTitleOffset(self.style.plot_ytitle_offset)
+            axes[1].SetTitleOffset(bundle.ytitle_offset)
             # apply styles, this might need to get more fine grained
             # markers are avilable in children of TAttMarker
-            if isinstance(obj, ROOT.TAttMarker) and pdic.get('markerstyle', None):
-                # marker size 1 == 8 px, and never scales with canvas...
-                obj.SetMarkerSize(self.style.markerSizepx / 8.0)
+            if isinstance(obj, ROOT.TAttMarker) and rec.markerstyle:
+                obj.SetMarkerSize(bundle.marker_size)
+            rec.themed = themed
 
-    def add_plottable(self, obj, legend_title='', markerstyle=20, color=None, use_as_frame=None, linestyle=None):
+    def _palette_indices(self):
+        """
+        ROOT color indices of this figure's palette; resolved only if the palette changed
+        """
+        # make sure the palette has enough colors for all plottables without a given color
+        nauto = sum(1 for rec in self._plottables if not rec.color)
+        key = (self.plot.palette, max(self.plot.palette_ncolors, nauto))
+        if self._palette_memo is None or self._palette_memo[0] != key:
+            indices = [color_registry.index(color) for color in get_color_generator(*key)]
+            self._palette_memo = (key, indices)
+        return self._palette_memo[1]
+
+    def add_plottable(self, obj, legend_title='', markerstyle=20, color=None, use_as_frame=None, linestyle=None,
+                      copy=True):
         """
         Add a plottable objet to this figure. This function performs a
         copy of the passed object and assigns it a random name. Once
@@ -216,8 +364,11 @@ class Figure(object):
 
         Parameters
         ----------
-        obj : Hist1D, Graph, None
-            A root plottable object; If none, this object will only show up in the legend
+        obj : Hist1D, Graph, tuple, None
+            A root plottable object; If none, this object will only show up in the legend.
+            A tuple of NumPy arrays is turned into a graph: `(x, y)`,
+            `(x, y, yerr)`, `(x, y, xerr, yerr)` or `(x, y, exl, exh,
+            eyl, eyh)`; errors of shape (2, n) are taken as (low, high).
         legend_title : string
             Title for this plottable as shown in the legend
         linestyle : int
@@ -225,28 +376,87 @@ class Figure(object):
             notation for TAttLine. Histograms hace style 0 (no
             connection) by default, Graphs and functions have style 1
             (solid line).
+        copy : bool
+            If False, only a reference to `obj` is kept and each draw
+            uses a temporary copy which lives as long as the canvas.
+            This avoids holding two copies of large objects, but `obj`
+            must not be deleted (eg. by closing its file) as long as
+            the figure is drawn; changes to it show up in later draws.
         """
-        # Make a copy if we got a plottable
-        if obj is not None:
+        if obj is None:
+            p = ROOT.TLegendEntry()
+        elif isinstance(obj, tuple):
+            # a fresh object, so there is nothing to copy
+            p = asrootpy(graph_from_arrays(obj, gen_random_name()))
+            copy = True
+        elif copy:
             p = asrootpy(obj.Clone(gen_random_name()))
         else:
-            p = ROOT.TLegendEntry()
-        if isinstance(p, ROOT.TH1):
+            p = asrootpy(obj)
+        if copy and isinstance(p, ROOT.TH1):
             p.SetDirectory(0)  # make sure that the hist is not associated with a file anymore!
+        if isinstance(color, (list, np.ndarray)):
+            # rgb(a) sequences are looked up in the colour registry like tuples
+            color = tuple(float(c) for c in color)
         if not linestyle:
             if isinstance(p, ROOT.TH1):
                 linestyle = 0
             else:
                 linestyle = 1
-        self._plottables.append({'p': p,
-                                 'legend_title': legend_title,
-                                 'markerstyle': markerstyle,
-                                 'linestyle': linestyle,
-                                 'color': color,
-                                 'use_as_frame': use_as_frame,
-                                 })
+        self._add_record(_PlottableRecord(p, legend_title=legend_title, markerstyle=markerstyle,
+                                          linestyle=linestyle, color=color, use_as_frame=use_as_frame,
+                                          copied=copy or obj is None))
 
-    def import_plottables_from_canvas(self, canvas):
+    def _add_record(self, rec):
+        """
+        Append a `_PlottableRecord` and update the indices
+        """
+        self._plottables.append(rec)
+        if rec.legend_title:
+            self._nlegend_entries += 1
+        if rec.use_as_frame and self._frame_record is None:
+            self._frame_record = rec
+
+    @contextmanager
+    def _copied_references(self, profile):
+        """
+        Context in which the plottables added with `copy=False` are
+        replaced by fresh copies. Afterwards, the figure holds the
+        references again and the copies only live as long as the
+        canvas they were drawn into.
+        """
+        referenced = [(rec, rec.p) for rec in self._plottables if not rec.copied]
+        with profile.phase('copy'):
+            for rec, obj in referenced:
+                rec.p = asrootpy(obj.Clone(gen_random_name()))
+                if isinstance(rec.p, ROOT.TH1):
+                    rec.p.SetDirectory(0)
+                rec.themed = None
+        try:
+            yield
+        finally:
+            for rec, obj in referenced:
+                rec.p = obj
+                rec.themed = None
+
+    def memory_usage(self, include_references=False):
+        """
+        Estimate the memory held by the plottables of this figure
+
+        Parameters
+        ----------
+        include_references : bool
+            Also count plottables which were added with `copy=False`
+
+        Returns
+        -------
+        int :
+            Size in bytes
+        """
+        return sum(plottable_nbytes(rec.p) for rec in self._plottables
+                   if include_references or rec.copied)
+
+    def import_plottables_from_canvas(self, canvas, copy=True):
         """
         Import plottables from a canvas which was previously created with roofie
 
@@ -254,6 +464,10 @@ class Figure(object):
         ----------
         canvas : Canvas
             A canvas which was created with roofie.
+        copy : bool
+            If False, the plottables are taken out of `canvas` instead
+            of being copied. Use this if `canvas` is not needed
+            afterwards, eg. if it was just read from a file.
 
         Raises
         ------
@@ -263,29 +477,35 @@ class Figure(object):
         pad = canvas.FindObject('plot')
         if pad == None:  # "is None" does not work since TObject is not None, but equal to None...
             raise ValueError("Cannot import canvas, since it is not in roofie format.")
-        try:
-            legend = [p for p in pad.GetListOfPrimitives() if isinstance(p, ROOT.TLegend)][0]
-        except IndexError:
-            legend_entries = []
-        else:
-            legend_entries = [e for e in legend.GetListOfPrimitives()]
+        # the legend might also be in a seperate pad
+        labels, header = _legend_labels(canvas)
+        primitives = pad.GetListOfPrimitives()
         # load the plottables but ignore the frame
         plottables = []
-        for p in pad.GetListOfPrimitives():
-            if is_plottable(p):
-                if p.GetName() != "__frame":
-                    plottables.append({'p': asrootpy(p.Clone(gen_random_name()))})
-                    for legend_entry in legend_entries:
-                        if p == legend_entry.GetObject():
-                            plottables[-1]['legend_title'] = legend_entry.GetLabel()
-                else:
-                    self.xtitle = p.GetXaxis().GetTitle()
-                    self.ytitle = p.GetYaxis().GetTitle()
+        for p in list(primitives):
+            if not is_plottable(p):
+                continue
+            if p.GetName() == "__frame":
+                self.xtitle = p.GetXaxis().GetTitle()
+                self.ytitle = p.GetYaxis().GetTitle()
+                continue
+            legend_title = labels.get(_address(p), '')
+            if copy:
+                p = asrootpy(p.Clone(gen_random_name()))
+            else:
+                # detach `p` so that it survives the deletion of the canvas
+                primitives.Remove(p)
+                p = asrootpy(p)
+                ROOT.SetOwnership(p, True)
+            if isinstance(p, ROOT.TH1):
+                p.SetDirectory(0)
+            plottables.append(_PlottableRecord(p, legend_title=legend_title))
         # set legend title if any
-        if legend.GetHeader():
-            self.legend.title = legend.GetHeader()
+        if header:
+            self.legend.title = header
 
-        self._plottables += plottables
+        for rec in plottables:
+            self._add_record(rec)
 
     def draw_to_canvas(self):
         """
@@ -293,31 +513,30 @@ class Figure(object):
         """
         if len(self._plottables) == 0:
             raise IndexError("No plottables defined")
-        c = Canvas(width=self.style.canvasWidth,
-                   height=self.style.canvasHeight,
-                   size_includes_decorations=True)
-        if self.legend.position == 'seperate':
-            legend_width = .2
-            pad_legend = Pad(1 - legend_width, 0, 1., 1., name="legend")
-            pad_legend.SetLeftMargin(0.0)
-            pad_legend.SetFillStyle(0)  # make this pad transparent
-            pad_legend.Draw()
-        pad_plot = self._prepare_plot_pad()
+        with self._profiled('draw') as profile:
+            return self._draw_to_canvas(profile)
 
-        # awkward hack around a bug in get limits where everything fails if one plottable is shitty...
-        xmin, xmax, ymin, ymax = None, None, None, None
-        for pdic in self._plottables:
-            try:
-                limits = get_limits(pdic['p'], logx=self.plot.logx, logy=self.plot.logy)
-                # Beware: Python 2 evaluates min/max of None in an undefined way with no error! Wow...
-                xmin = min([xmin, limits[0]]) if xmin is not None else limits[0]
-                xmax = max([xmax, limits[1]]) if xmax is not None else limits[1]
-                ymin = min([ymin, limits[2]]) if ymin is not None else limits[2]
-                ymax = max([ymax, limits[3]]) if ymax is not None else limits[3]
-            except TypeError:
-                # some plottables do not work with this rootpy function (eg. graph without points, tf1)
-                # TODO: should be fixed upstream
-                pass
+    def _draw_to_canvas(self, profile):
+        with self._copied_references(profile):
+            with profile.phase('canvas'):
+                c, pad_plot, pad_legend = self._prepare_canvas()
+            with profile.phase('limits'):
+                limits = self._limits()
+            self._draw_to_pad(profile, pad_plot, pad_legend, limits)
+        return c
+
+    def _limits(self):
+        """
+        Axis ranges of this figure: the ones given in `Plot` or else the ones of the data
+
+        Returns
+        -------
+        tuple :
+            (xmin, xmax, ymin, ymax)
+        """
+        xmin, xmax, ymin, ymax = get_limits([rec.p for rec in self._plottables],
+                                            logx=self.plot.logx, logy=self.plot.logy,
+                                            percentiles=self.plot.limits_percentiles)
         # overwrite these ranges if defaults are given
         if self.plot.xmin is not None:
             xmin = self.plot.xmin
@@ -330,13 +549,24 @@ class Figure(object):
 
         if not all([val is not None for val in [xmin, xmax, ymin, ymax]]):
             raise TypeError("unable to determine plot axes ranges from the given plottables")
+        return xmin, xmax, ymin, ymax
 
-        self._prepare_frame(xmin, xmax, ymin, ymax)
-        self._theme_plottables()
+    def _draw_to_pad(self, profile, pad_plot, pad_legend, limits):
+        """
+        Draw the frame, the plottables and the legend into the
+        prepared (and current) `pad_plot` within the given axis ranges.
+        The legend goes to `pad_legend` if it is drawn separately.
+        """
+        xmin, xmax, ymin, ymax = limits
+        with profile.phase('frame'):
+            self._prepare_frame(xmin, xmax, ymin, ymax)
+        with profile.phase('theme'):
+            self._theme_plottables()
         # Set ranges
-
-        for i, pdic in enumerate(self._plottables):
-            obj = pdic['p']
+        frame_size = frame_size_px(self)
+        for rec in self._plottables:
+            obj = rec.p
+            profile.count(obj)
             xaxis = obj.GetXaxis()
             yaxis = obj.GetYaxis()
 
@@ -348,10 +578,17 @@ class Figure(object):
                 # 'P' plots the current marker, 'L' would connect the dots with a simple line
                 # see: https://root.cern.ch/doc/master/classTGraphPainter.html for more draw options
                 drawoption = 'Psame'
+                if self.plot.decimate:
+                    with profile.phase('reduce'):
+                        obj = decimate_graph(obj, self.plot.decimate, (xmin, xmax, ymin, ymax),
+                                             (self.plot.logx, self.plot.logy), frame_size)
             elif isinstance(obj, ROOT.TH1):
+                if self.plot.display_rebin:
+                    with profile.phase('reduce'):
+                        obj = rebin_hist(obj, (xmin, xmax), self.plot.logx, frame_size[0])
                 obj.SetStats(0)
-                xaxis.SetRangeUser(xmin, xmax)
-                yaxis.SetRangeUser(ymin, ymax)
+                obj.GetXaxis().SetRangeUser(xmin, xmax)
+                obj.GetYaxis().SetRangeUser(ymin, ymax)
                 drawoption = 'same'
             elif isinstance(obj, ROOT.TF1):
                 # xaxis.SetLimits(xmin, xmax)
@@ -359,14 +596,51 @@ class Figure(object):
                 drawoption = 'same'
             else:
                 raise TypeError("Un-plottable type given.")
-            obj.Draw(drawoption)
-        if self.legend.position == 'seperate':
-            self._draw_legend(pad_legend)
+            with profile.phase('draw'):
+                self._draw(obj, drawoption)
+        with profile.phase('legend'):
+            if self.legend.position == 'seperate' and pad_legend is not None:
+                self._draw_legend(pad_legend)
+            else:
+                self._draw_legend(pad_plot)
+        with profile.phase('update'):
+            # needed sometimes with import of canvas. maybe because other "plot" pads exist...
+            pad_plot.Modified()
+            pad_plot.Update()
+
+    @contextmanager
+    def _profiled(self, kind):
+        """
+        Context yielding the `RenderProfile` to record into or a no-op
+        stand-in if profiling is off. Renders nested in a profiled one
+        (eg. drawing during an export) record into the outer profile.
+        """
+        if self._profile is not None:
+            yield self._profile
+            return
+        if not (self.profile_renders or profiling.has_render_hooks()):
+            yield profiling.NULL_PROFILE
+            return
+        profile = self._profile = profiling.RenderProfile(kind)
+        try:
+            yield profile
+        finally:
+            self._profile = None
+        profile.finish()
+        self.last_render_profile = profile
+        profiling.run_render_hooks(self, profile)
+
+    def _draw(self, obj, option=''):
+        """
+        Draw `obj` into the current pad. With `reuse_canvas`, the figure
+        instead of rootpy keeps `obj` alive, so that it can be freed
+        once it is cleared from the reused pad.
+        """
+        if self.reuse_canvas:
+            ROOT.TObject.Draw(obj, option)
+            self._drawn.append(obj)
         else:
-            self._draw_legend(pad_plot)
-        # needed sometimes with import of canvas. maybe because other "plot" pads exist...
-        pad_plot.Update()
-        return c
+            obj.Draw(option)
 
     def delete_plottables(self):
         """
@@ -374,6 +648,8 @@ class Figure(object):
         new ones while keeping the lables.
         """
         self._plottables = []
+        self._nlegend_entries = 0
+        self._frame_record = None
 
     def save_to_root_file(self, in_f, name, path=''):
         """
@@ -392,33 +668,141 @@ class Figure(object):
             The file where the object was written to
         """
         f = asrootpy(in_f)
-        c = self.draw_to_canvas()
-        c.name = name
+        key = None
+        c = None
+        if self.render_cache is not None:
+            key = figure_digest(self)
+            cached_path = self.render_cache.lookup(key, 'root')
+            if cached_path is not None:
+                cached_f = ROOT.TFile.Open(cached_path)
+                c = asrootpy(cached_f.Get('canvas'))
+                cached_f.Close()
+        if c is None:
+            c = self._get_canvas()
+            if key is not None:
+                self._store_canvas_in_cache(key, c)
         try:
             f.mkdir(path, recurse=True)
         except ValueError:
             pass
         f.cd(path)
-        success = c.Write()
+        success = c.Write(name)
         if success == 0:
             raise ValueError("Could not write to file!")
         return f
 
+    def _store_canvas_in_cache(self, key, c):
+        """
+        Put the given canvas into the render cache via a temporary root file
+        """
+        fd, tmp = tempfile.mkstemp(suffix='.root')
+        os.close(fd)
+        try:
+            tmp_f = ROOT.TFile.Open(tmp, 'recreate')
+            c.Write('canvas')
+            tmp_f.Close()
+            self.render_cache.store(key, 'root', tmp)
+        finally:
+            os.remove(tmp)
+
     def save_to_file(self, path, name):
         """
         Save the current figure to the given root file under the given path
         Parameters
         ----------
         name : string
-            Name of the file including its extension
+            Name of the file including its extension; see `export` for the supported formats
         path : string
             Path excluding the file name, relative files are interpreted relative to the working dir
         """
         # check if the name has the right extension
         if len(name.split('.')) != 2:
             raise ValueError("Filename must be given with extension")
-        if name.split('.')[1] != 'pdf':
-            raise NotImplementedError("Only PDF export is implemented at the moment")
+        basename, ext = name.split('.')
+        self.export(path, basename, formats=[ext])
+
+    def to_spec(self, compress=False):
+        """
+        All settings and the data of the plottables of this figure in
+        roofie's compact binary spec format. Much cheaper than
+        rendering; use it to cache figures or to send them to other
+        processes. See `roofie.spec` for the details.
+
+        Parameters
+        ----------
+        compress : bool
+            Compress the data arrays with zlib
+
+        Returns
+        -------
+        bytes :
+        """
+        return spec.dumps(spec.figure_to_spec(self), compress=compress)
+
+    @staticmethod
+    def from_spec(data):
+        """
+        Create a new Figure from the output of `to_spec` (or from a spec dict)
+        """
+        if not isinstance(data, dict):
+            data = spec.loads(data)
+        return spec.figure_from_spec(data)
+
+    def save_to_file_async(self, path, name):
+        """
+        Like `save_to_file`, but the figure is drawn and written by a
+        background process. A snapshot of the figure is taken right
+        away, so it may be changed or reused as soon as this returns.
+        Blocks if too many figures are already waiting to be written.
+
+        Returns
+        -------
+        RenderFuture :
+            Its `result()` is the path of the written file; see also `roofie.flush`
+        """
+        if len(name.split('.')) != 2:
+            raise ValueError("Filename must be given with extension")
+        return background.submit('file', self.to_spec(), (path, name))
+
+    def save_to_root_file_async(self, fname, name, path=''):
+        """
+        Like `save_to_root_file`, but written by a background process.
+        The root file is given by its name and kept open by the
+        background process until `roofie.flush` is called; existing
+        files are updated.
+
+        Returns
+        -------
+        RenderFuture :
+            Its `result()` is the name of the root file
+        """
+        return background.submit('root', self.to_spec(), (fname, name, path))
+
+    def export(self, path, name, formats=('pdf', ), dpi=None):
+        """
+        Draw this figure once and write it to a file for each of the given formats.
+        The canvas is only kept until all files are written.
+
+        Parameters
+        ----------
+        path : string
+            Folder where the files are written to; created if needed
+        name : string
+            File name without extension
+        formats : list
+            Any of 'pdf', 'png', 'svg', 'eps', 'ps' and 'root'. The
+            root file contains the canvas under `name`.
+        dpi : float
+            Resolution of png files; defaults to one pixel per point of the canvas (72 dpi)
+
+        Returns
+        -------
+        list :
+            Paths of the written files
+        """
+        unknown = [fmt for fmt in formats if fmt not in _EXPORT_FORMATS]
+        if unknown:
+            raise NotImplementedError("Export to {0} is not implemented".format(", ".join(unknown)))
         # strip of tailing / if any
         # this is not compatible with windows, I guess!
         path = path.rstrip('/')
@@ -426,7 +810,44 @@ class Figure(object):
             os.makedirs(path)
         except OSError:
             pass
+        written = []
+        # drawn on demand, not at all if all formats are cached
+        c = None
+        with self._profiled('export') as profile, scoped_style():
+            with profile.phase('cache'):
+                key = figure_digest(self) if self.render_cache is not None else None
+            # pdf and ps files take their page size from the global style when printing
+            ROOT.gStyle.SetPaperSize(self.style.canvasWidth / self.style.pt_per_cm,
+                                     self.style.canvasHeight / self.style.pt_per_cm,)
+            for fmt in formats:
+                fname = "{0}/{1}.{2}".format(path, name, fmt)
+                cache_ext = fmt if (fmt != 'png' or dpi is None) else "{0}dpi.png".format(dpi)
+                written.append(fname)
+                if key is not None and fmt != 'root':
+                    with profile.phase('cache'):
+                        if self.render_cache.fetch(key, cache_ext, fname):
+                            continue
+                # the phases of drawing are recorded by `draw_to_canvas`
+                if c is None:
+                    c = self._get_canvas()
+                with profile.phase('print_' + fmt):
+                    if fmt == 'root':
+                        f = ROOT.TFile.Open(fname, 'recreate')
+                        c.Write(name)
+                        f.Close()
+                    elif fmt == 'png' and dpi is not None:
+                        _print_png(c, fname, dpi)
+                    else:
+                        c.Print(fname)
+                if key is not None and fmt != 'root':
+                    with profile.phase('cache'):
+                        self.render_cache.store(key, cache_ext, fname)
+        return written
 
+    def _get_canvas(self):
+        """
+        Draw the canvas of this figure without changing the global paper size
+        """
         # The order of the following is important! First, set paper
         # size, then draw the canvas and then create the pdf Doin
         # pdf.Range(10, 10) is not sufficient. it just does random
@@ -435,13 +856,51 @@ class Figure(object):
         # either...
         # paper_width, paper_height = ROOT.Double(), ROOT.Double()
         # ROOT.gStyle.GetPaperSize(paper_width, paper_height)
-        ROOT.gStyle.SetPaperSize(self.style.canvasWidth / self.style.pt_per_cm,
-                                 self.style.canvasHeight / self.style.pt_per_cm,)
-        c = self.draw_to_canvas()
-        c.Print("{0}/{1}".format(path, name))
+        with scoped_style():
+            ROOT.gStyle.SetPaperSize(self.style.canvasWidth / self.style.pt_per_cm,
+                                     self.style.canvasHeight / self.style.pt_per_cm,)
+            c = self.draw_to_canvas()
+        return c
 
-        # reset the page size
-        # ROOT.gStyle.SetPaperSize(paper_width, paper_height)
+    def _prepare_canvas(self):
+        """
+        Create the canvas and its pads, or recycle the ones of the
+        previous draw in `reuse_canvas` mode if the layout is unchanged
+
+        Returns
+        -------
+        tuple :
+            (canvas, plot pad, legend pad or None)
+        """
+        layout = (self.style, self.legend.position == 'seperate')
+        if self.reuse_canvas and self._reusable is not None and self._reusable[0] == layout:
+            _, c, pad_plot, pad_legend = self._reusable
+            for pad in (pad_plot, pad_legend):
+                if pad is not None:
+                    pad.GetListOfPrimitives().Clear('nodelete')
+            # nothing references the previously drawn objects anymore
+            self._drawn = []
+            c.cd()
+            pad_plot.cd()
+            self._configure_plot_pad(pad_plot)
+            return c, pad_plot, pad_legend
+        self._reusable = None
+        self._reusable_frame = None
+        self._drawn = []
+        c = plotting.Canvas(width=self.style.canvasWidth,
+                   height=self.style.canvasHeight,
+                   size_includes_decorations=True)
+        pad_legend = None
+        if self.legend.position == 'seperate':
+            legend_width = .2
+            pad_legend = plotting.Pad(1 - legend_width, 0, 1., 1., name="legend")
+            pad_legend.SetLeftMargin(0.0)
+            pad_legend.SetFillStyle(0)  # make this pad transparent
+            pad_legend.Draw()
+        pad_plot = self._prepare_plot_pad()
+        if self.reuse_canvas:
+            self._reusable = (layout, c, pad_plot, pad_legend)
+        return c, pad_plot, pad_legend
 
     def _prepare_plot_pad(self):
         """
@@ -455,10 +914,17 @@ class Figure(object):
             legend_width = .2
         else:
             legend_width = 0
-        pad_plot = Pad(0., 0., 1 - legend_width, 1., name="plot")
+        pad_plot = plotting.Pad(0., 0., 1 - legend_width, 1., name="plot")
         pad_plot.SetMargin(*self.style.plot_margins)
         pad_plot.Draw()
         pad_plot.cd()
+        self._configure_plot_pad(pad_plot)
+        return pad_plot
+
+    def _configure_plot_pad(self, pad_plot):
+        """
+        Apply the `Plot` settings to the plot pad
+        """
         pad_plot.SetTicks()
         pad_plot.SetLogx(self.plot.logx)
         pad_plot.SetLogy(self.plot.logy)
@@ -472,7 +938,6 @@ class Figure(object):
             pad_plot.SetLogx()
         if self.plot.logy:
             pad_plot.SetLogy(True)
-        return pad_plot
 
     def _prepare_frame(self, xmin, xmax, ymin, ymax):
         """
@@ -484,19 +949,23 @@ class Figure(object):
             The plottable which was used to draw the frame
         """
         # draw an empty frame within the given ranges;
-        frame_from_plottable = [p for p in self._plottables if p.get('use_as_frame')]
-        if len(frame_from_plottable) > 0:
-            frame = frame_from_plottable[0]['p'].Clone('__frame')
+        if self._frame_record is not None:
+            frame = self._frame_record.p.Clone('__frame')
             frame.Reset()
             frame.SetStats(0)
             frame.xaxis.SetRangeUser(xmin, xmax)
             frame.yaxis.SetRangeUser(ymin, ymax)
             drawoption = ""
         else:
-            frame = Graph()
-            frame.SetName("__frame")
-            # add a silly point in order to have root draw this frame...
-            frame.SetPoint(0, 0, 0)
+            if self.reuse_canvas and self._reusable_frame is not None:
+                frame = self._reusable_frame
+            else:
+                frame = plotting.Graph()
+                frame.SetName("__frame")
+                # add a silly point in order to have root draw this frame...
+                frame.SetPoint(0, 0, 0)
+                if self.reuse_canvas:
+                    self._reusable_frame = frame
             frame.GetXaxis().SetLimits(xmin, xmax)
             frame.GetYaxis().SetLimits(ymin, ymax)
             frame.SetMinimum(ymin)
@@ -511,7 +980,7 @@ class Figure(object):
         frame.GetXaxis().SetTitle(self.xtitle)
         frame.GetYaxis().SetTitle(self.ytitle)
         frame.GetYaxis().SetTitleOffset(self.style.plot_ytitle_offset)
-        frame.Draw(drawoption)
+        self._draw(frame, drawoption)
         return frame
 
     def _draw_legend(self, pad):
@@ -519,17 +988,17 @@ class Figure(object):
         Draw the legend into the given pad
         """
         # do we have legend titles?
-        if not any([pdic['legend_title'] for pdic in self._plottables]):
+        if self._nlegend_entries == 0:
             return
 
         leg = self._create_legend()
         longest_label = 0
-        for pdic in self._plottables:
-            if not pdic.get('legend_title', False):
+        for rec in self._plottables:
+            if not rec.legend_title:
                 continue
-            leg.AddEntry(pdic['p'], pdic['legend_title'], 'lp')
-            if len(pdic['legend_title']) > longest_label:
-                longest_label = len(pdic['legend_title'])
+            leg.AddEntry(rec.p, rec.legend_title, 'lp')
+            if len(rec.legend_title) > longest_label:
+                longest_label = len(rec.legend_title)
 
         # Set the legend position
         leg_hight = leg.y2 - leg.y1
@@ -541,7 +1010,7 @@ class Figure(object):
             leg.y1 = self.legend.position[1]
             leg.x2 = self.legend.position[0] + leg_width
             leg.y2 = self.legend.position[1] + leg_hight
-            leg.Draw()
+            self._draw(leg)
         else:
             # vertical:
             if self.legend.position.startswith('t'):
@@ -561,9 +1030,9 @@ class Figure(object):
             if self.legend.position == 'seperate':
                 # want to stay in the pad-plot, so we open a context to draw the legend
                 with pad:
-                    leg.Draw()
+                    self._draw(leg)
             else:
-                leg.Draw()
+                self._draw(leg)
 
     def add_text(self, xlow, ylow, text, size=None):
         """
@@ -0,0 +1,258 @@
+"""
+Many figures drawn as the pads of a single canvas.
+
+Example
+-------
+    grid = FigureGrid(8, 8, style=Styles.Presentation_half)
+    for (row, col), fig in zip(channels, figures):
+        grid[row, col] = fig
+    grid.save_to_file('qa', 'channels.pdf')
+
+Each cell gets the size of the grid's style's canvas and every figure
+is drawn with the grid's style, regardless of its own. Axis ranges can
+be shared within each row and column (the default) or by all cells.
+"""
+
+from contextlib import contextmanager
+import os
+
+from . import profiling
+from ._root import ROOT, plotting
+from .figure import Figure, Styles, _EXPORT_FORMATS, _print_png
+from .utils import scoped_style
+
+_SHARING = (False, 'row', 'col', 'all')
+
+
+_MISSING = object()
+
+
+@contextmanager
+def _override(obj, name, value):
+    """
+    Set the attribute `name` of `obj` for the duration of the context.
+    Afterwards, it falls back to the class attribute again if it was
+    not set on `obj` itself before.
+    """
+    previous = obj.__dict__.get(name, _MISSING)
+    setattr(obj, name, value)
+    try:
+        yield obj
+    finally:
+        if previous is _MISSING:
+            delattr(obj, name)
+        else:
+            setattr(obj, name, previous)
+
+
+@contextmanager
+def _in_cell(fig, style):
+    """
+    Draw `fig` with the given style and without touching the canvas,
+    frame and drawn objects which it keeps for `reuse_canvas`. A cell
+    has no room for a separate legend pad, so such legends go to the
+    top right corner of the plot.
+    """
+    position = fig.legend.position
+    if position == 'seperate':
+        position = 'tr'
+    with _override(fig, 'style', style), _override(fig.legend, 'position', position):
+        # the grid's pad keeps the drawn objects alive instead of the figure
+        with _override(fig, 'reuse_canvas', False):
+            yield fig
+
+
+def _merge(ranges):
+    """
+    Smallest range containing all the given (low, high) pairs
+    """
+    return min(low for low, high in ranges), max(high for low, high in ranges)
+
+
+class FigureGrid(object):
+    """
+    Figures arranged in `nrows` x `ncols` pads of one canvas; cells
+    are addressed as `grid[row, col]` starting from the top left.
+
+    Parameters
+    ----------
+    nrows, ncols : int
+        Size of the grid
+    style : class
+        One of `Styles`, used for all cells. Its canvas size is the size of each cell.
+    sharex : bool, string
+        Share the x range of the cells in each column ('col', the
+        default), all cells ('all' or True) or not at all (False)
+    sharey : bool, string
+        Share the y range of the cells in each row ('row', the
+        default), all cells ('all' or True) or not at all (False)
+    """
+    def __init__(self, nrows, ncols, style=Styles.Presentation_half, sharex='col', sharey='row'):
+        sharex = 'all' if sharex is True else sharex
+        sharey = 'all' if sharey is True else sharey
+        if sharex not in _SHARING or sharey not in _SHARING:
+            raise ValueError("sharex and sharey must be True or one of {0}".format(_SHARING))
+        self.nrows = nrows
+        self.ncols = ncols
+        self.style = style
+        self.sharex = sharex
+        self.sharey = sharey
+        self.figures = {}
+        self.last_render_profile = None
+        # the canvas and its pads of the latest draw
+        self._canvas = None
+        self._pads = []
+
+    def __setitem__(self, pos, fig):
+        row, col = pos
+        if not (0 <= row < self.nrows and 0 <= col < self.ncols):
+            raise IndexError("Cell {0} is outside of the {1}x{2} grid".format(pos, self.nrows, self.ncols))
+        if not isinstance(fig, Figure):
+            raise TypeError("Only Figures can be put into a grid")
+        self.figures[row, col] = fig
+
+    def __getitem__(self, pos):
+        return self.figures[tuple(pos)]
+
+    def __len__(self):
+        return len(self.figures)
+
+    def _shared(self, sharing, row, col):
+        """
+        Key of the group of cells sharing a range with the cell at (row, col)
+        """
+        if sharing == 'all':
+            return 'all'
+        if sharing == 'row':
+            return 'row', row
+        if sharing == 'col':
+            return 'col', col
+        return row, col
+
+    def _limits(self):
+        """
+        Axis ranges of each cell; the data ranges are only computed once
+        per figure and then merged for each shared row or column
+
+        Returns
+        -------
+        dict :
+            (row, col) -> (xmin, xmax, ymin, ymax)
+
+        Raises
+        ------
+        ValueError :
+            If cells sharing a range differ in whether that axis is logarithmic
+        """
+        own = dict((pos, fig._limits()) for pos, fig in self.figures.items())
+        xranges, yranges = {}, {}
+        xlogs, ylogs = {}, {}
+        for (row, col), (xmin, xmax, ymin, ymax) in sorted(own.items()):
+            plot = self.figures[row, col].plot
+            xkey = self._shared(self.sharex, row, col)
+            ykey = self._shared(self.sharey, row, col)
+            # a linear range may reach below zero, which a log axis cannot show
+            if xlogs.setdefault(xkey, bool(plot.logx)) != bool(plot.logx):
+                raise ValueError("Cell {0} shares its x range with cells of a different logx".format((row, col)))
+            if ylogs.setdefault(ykey, bool(plot.logy)) != bool(plot.logy):
+                raise ValueError("Cell {0} shares its y range with cells of a different logy".format((row, col)))
+            xranges.setdefault(xkey, []).append((xmin, xmax))
+            yranges.setdefault(ykey, []).append((ymin, ymax))
+        xranges = dict((key, _merge(ranges)) for key, ranges in xranges.items())
+        yranges = dict((key, _merge(ranges)) for key, ranges in yranges.items())
+        limits = {}
+        for row, col in own:
+            limits[row, col] = (xranges[self._shared(self.sharex, row, col)] +
+                                yranges[self._shared(self.sharey, row, col)])
+        return limits
+
+    @contextmanager
+    def _profiled(self):
+        if not (Figure.profile_renders or profiling.has_render_hooks()):
+            yield profiling.NULL_PROFILE
+            return
+        profile = profiling.RenderProfile('grid')
+        yield profile
+        profile.finish()
+        self.last_render_profile = profile
+        profiling.run_render_hooks(self, profile)
+
+    def draw_to_canvas(self):
+        """
+        Draw all figures into the pads of one new canvas, which is returned
+        """
+        if len(self.figures) == 0:
+            raise IndexError("No figures in this grid")
+        for pos, fig in self.figures.items():
+            if len(fig._plottables) == 0:
+                raise IndexError("No plottables defined in the figure at {0}".format(pos))
+        with self._profiled() as profile:
+            with profile.phase('limits'):
+                limits = self._limits()
+            with profile.phase('canvas'):
+                c = plotting.Canvas(width=self.style.canvasWidth * self.ncols,
+                                    height=self.style.canvasHeight * self.nrows,
+                                    size_includes_decorations=True)
+            pads = []
+            for (row, col), fig in sorted(self.figures.items()):
+                with profile.phase('canvas'):
+                    c.cd()
+                    pad = plotting.Pad(float(col) / self.ncols, 1 - float(row + 1) / self.nrows,
+                                       float(col + 1) / self.ncols, 1 - float(row) / self.nrows,
+                                       name="cell_{0}_{1}".format(row, col))
+                    pad.SetMargin(*self.style.plot_margins)
+                    pad.Draw()
+                    pad.cd()
+                    fig._configure_plot_pad(pad)
+                    pads.append(pad)
+                with _in_cell(fig, self.style), fig._copied_references(profile):
+                    fig._draw_to_pad(profile, pad, None, limits[row, col])
+            c.cd()
+        self._canvas = c
+        self._pads = pads
+        return c
+
+    def export(self, path, name, formats=('pdf', ), dpi=None):
+        """
+        Draw the grid once and write it to one file per format; see `Figure.export`
+
+        Returns
+        -------
+        list :
+            Paths of the written files
+        """
+        unknown = [fmt for fmt in formats if fmt not in _EXPORT_FORMATS]
+        if unknown:
+            raise NotImplementedError("Export to {0} is not implemented".format(", ".join(unknown)))
+        path = path.rstrip('/')
+        try:
+            os.makedirs(path)
+        except OSError:
+            pass
+        written = []
+        with scoped_style():
+            # pdf and ps files take their page size from the global style when printing
+            ROOT.gStyle.SetPaperSize(self.style.canvasWidth * self.ncols / self.style.pt_per_cm,
+                                     self.style.canvasHeight * self.nrows / self.style.pt_per_cm)
+            c = self.draw_to_canvas()
+            for fmt in formats:
+                fname = "{0}/{1}.{2}".format(path, name, fmt)
+                if fmt == 'root':
+                    f = ROOT.TFile.Open(fname, 'recreate')
+                    c.Write(name)
+                    f.Close()
+                elif fmt == 'png' and dpi is not None:
+                    _print_png(c, fname, dpi)
+                else:
+                    c.Print(fname)
+                written.append(fname)
+        return written
+
+    def save_to_file(self, path, name):
+        """
+        Save the grid to `path/name`; the extension of `name` gives the format
+        """
+        if len(name.split('.')) != 2:
+            raise ValueError("Filename must be given with extension")
+        basename, ext = name.split('.')
+        self.export(path, basename, formats=[ext])
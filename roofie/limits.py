@@ -0,0 +1,146 @@
+"""
+Determine the axis ranges of a figure from its plottables.
+
+The data of all plottables is read through NumPy views onto ROOT's
+buffers and the limits are computed in one vectorized pass over the
+concatenated arrays. Without percentiles, the result matches rootpy's
+`get_limits` with its default padding (10% along y, y-axis snapped to
+zero for positive data), except that logarithmic axes use the smallest
+positive value instead of cropping at an arbitrary small number.
+"""
+
+import math
+
+import numpy as np
+
+from ._root import ROOT
+
+from .arrays import hist_edges, hist_contents, hist_errors, graph_arrays
+
+
+def _extent(obj):
+    """
+    Arrays of the (low, center, high) values along x and y which
+    `obj` covers and whether the x values are bin edges, or `None` if
+    `obj` does not contribute to the ranges (e.g. functions or empty
+    graphs)
+    """
+    if isinstance(obj, ROOT.TH1):
+        if obj.GetDimension() != 1:
+            return None
+        edges = hist_edges(obj)
+        nbins = len(edges) - 1
+        # skip under- and overflow
+        y = hist_contents(obj)[1:nbins + 1].astype(np.float64)
+        eyl, eyh = [err[1:nbins + 1] for err in hist_errors(obj)]
+        x = 0.5 * (edges[:-1] + edges[1:])
+        return (edges[:-1], x, edges[1:]), (y - eyl, y, y + eyh), True
+    if isinstance(obj, ROOT.TGraph):
+        if obj.GetN() == 0:
+            return None
+        x, y, exl, exh, eyl, eyh = graph_arrays(obj)
+        return (x - exl, x, x + exh), (y - eyl, y, y + eyh), False
+    return None
+
+
+def _axis_range(lows, centers, highs, log, percentiles, binned=None):
+    """
+    Smallest and largest value along one axis or (None, None). The
+    arrays flagged in `binned` are bin edges, which always count in
+    full; the percentiles only apply to the other (data) arrays.
+    """
+    if binned is None:
+        binned = [False] * len(lows)
+    ranges = []
+    for edges in (False, True):
+        idx = [i for i, flag in enumerate(binned) if flag == edges]
+        if not idx:
+            continue
+        low, center, high = [np.concatenate([arrays[i] for i in idx]) for arrays in (lows, centers, highs)]
+        if log:
+            # error bars reaching below zero are clipped at the point itself
+            low = np.where(low > 0, low, center)
+            low, high = low[low > 0], high[high > 0]
+        if low.size == 0 or high.size == 0:
+            continue
+        if percentiles is None or edges:
+            ranges.append((low.min(), high.max()))
+        else:
+            ranges.append((np.percentile(low, percentiles[0]), np.percentile(high, percentiles[1])))
+    if not ranges:
+        return None, None
+    return min(low for low, high in ranges), max(high for low, high in ranges)
+
+
+def _pad_range(x1, x2, a, b, snap=False, log=False):
+    """
+    Extend the range [x1, x2] such that the fractions `a` and `b` of
+    the new range are below and above it, respectively:
+
+        x0         x1                x2       x3
+        |----------|-----------------|--------|
+
+    With `snap`, positive (negative) ranges are extended to include zero.
+    """
+    if log:
+        x1, x2 = math.log10(x1), math.log10(x2)
+    elif snap:
+        if x1 >= 0:
+            x1, a = 0, 0
+        elif x2 <= 0:
+            x2, b = 0, 0
+        if x1 == x2 == 0:
+            return 0., 1.
+    if x1 == x2:
+        x0, x3 = x1 - 1., x1 + 1.
+    else:
+        width = (x2 - x1) / (1. - a - b)
+        x0, x3 = x1 - a * width, x2 + b * width
+    if log:
+        return 10 ** x0, 10 ** x3
+    return x0, x3
+
+
+def get_limits(plottables, logx=False, logy=False, ypadding=0.1, percentiles=None):
+    """
+    Axis ranges which contain all given plottables including their errors
+
+    Parameters
+    ----------
+    plottables : list
+        TH1, TGraph or other objects; the latter are ignored
+    logx, logy : bool
+        Logarithmic axes only take positive values into account
+    ypadding : float
+        Fraction of the y-range added above and below the data; the
+        bottom padding is dropped if the y-axis is snapped to zero
+    percentiles : tuple
+        If given, `(low, high)` percentiles of the data along each axis
+        are used instead of the minimum and maximum. This keeps a few
+        outliers from squeezing everything else into a corner. The bin
+        edges of histograms are not data; their full x range is kept.
+
+    Returns
+    -------
+    tuple :
+        (xmin, xmax, ymin, ymax); `None` where it could not be determined
+    """
+    xs, ys = ([], [], []), ([], [], [])
+    binned = []
+    for obj in plottables:
+        extent = _extent(obj)
+        if extent is None:
+            continue
+        for axis, arrays in zip((xs, ys), extent[:2]):
+            for collection, arr in zip(axis, arrays):
+                collection.append(arr)
+        binned.append(extent[2])
+    if not xs[0]:
+        return None, None, None, None
+    xmin, xmax = _axis_range(xs[0], xs[1], xs[2], logx, percentiles, binned)
+    ymin, ymax = _axis_range(ys[0], ys[1], ys[2], logy, percentiles)
+    if xmin is not None:
+        xmin, xmax = _pad_range(xmin, xmax, 0, 0, log=logx)
+    if ymin is not None:
+        ymin, ymax = _pad_range(ymin, ymax, ypadding, ypadding, snap=True, log=logy)
+    return xmin, xmax, ymin, ymax
@@ -0,0 +1,89 @@
+"""
+Load figures back from canvases which roofie stored in root files.
+
+Example
+-------
+    for path, fig in iter_figures('plots.root'):
+        fig.style = Styles.Public_full
+        fig.save_to_file('restyled', path.replace('/', '_') + '.pdf')
+"""
+
+import logging
+
+from ._root import ROOT
+from .figure import Figure
+
+log = logging.getLogger("roofie.loader")
+
+
+def _iter_canvas_keys(directory, prefix):
+    """
+    Walk `directory` recursively and yield (path, key) for the newest
+    cycle of every canvas. Only the keys are read, not the objects.
+    """
+    seen = set()
+    for key in directory.GetListOfKeys():
+        name = key.GetName()
+        # the newest cycle comes first
+        if name in seen:
+            continue
+        seen.add(name)
+        path = prefix + name
+        cls = ROOT.TClass.GetClass(key.GetClassName())
+        if not cls:
+            continue
+        if cls.InheritsFrom('TDirectory'):
+            for item in _iter_canvas_keys(directory.GetDirectory(name), path + '/'):
+                yield item
+        elif cls.InheritsFrom('TCanvas'):
+            yield path, key
+
+
+def iter_figures(source, copy=False):
+    """
+    Lazily create a Figure for every roofie canvas in a root file.
+
+    The directory tree is walked once and each canvas is only read when
+    the next figure is requested, so that thousands of figures can be
+    processed without having all of them in memory. Canvases which were
+    not created by roofie are skipped.
+
+    Parameters
+    ----------
+    source : string, TDirectory
+        Path of a root file or an open file or directory
+    copy : bool
+        If True, the plottables are copied out of each canvas as in
+        `Figure.import_plottables_from_canvas`. By default they are
+        taken over from the just-read canvas, which avoids holding
+        every plottable twice.
+
+    Yields
+    ------
+    tuple :
+        (path of the canvas within `source`, Figure)
+    """
+    if isinstance(source, ROOT.TDirectory):
+        f, directory = None, source
+    else:
+        f = ROOT.TFile.Open(source)
+        if not f or f.IsZombie():
+            raise IOError("Cannot open root file '{0}'".format(source))
+        directory = f
+    try:
+        for path, key in _iter_canvas_keys(directory, ''):
+            canvas = key.ReadObj()
+            ROOT.SetOwnership(canvas, True)
+            fig = Figure()
+            try:
+                fig.import_plottables_from_canvas(canvas, copy=copy)
+            except ValueError:
+                log.debug("Skipping '{0}' which is not a roofie canvas".format(path))
+                continue
+            finally:
+                canvas.Close()
+                del canvas
+            yield path, fig
+    finally:
+        if f is not None:
+            f.Close()
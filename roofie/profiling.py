@@ -0,0 +1,150 @@
+"""
+Timings of the phases of rendering a figure.
+
+Profiling is off by default. Turn it on for all figures with
+
+    Figure.profile_renders = True
+
+after which `fig.last_render_profile` holds a `RenderProfile` of the
+latest `draw_to_canvas` or `export`/`save_to_file` of a figure. To
+send the numbers somewhere else, register a hook; profiling is on
+while any hook is registered:
+
+    def to_monitoring(fig, profile):
+        send(profile.as_dict())
+
+    add_render_hook(to_monitoring)
+"""
+
+from collections import OrderedDict
+import logging
+from contextlib import contextmanager
+from timeit import default_timer
+
+from ._root import ROOT
+from .arrays import _hist_ncells
+
+log = logging.getLogger("roofie.profiling")
+
+_HOOKS = []
+
+
+class RenderProfile(object):
+    """
+    Timings and counts of one render of a figure
+
+    Attributes
+    ----------
+    kind : string
+        'draw' for `Figure.draw_to_canvas`, 'export' for
+        `Figure.export` (and thus `save_to_file`) and 'grid' for
+        `FigureGrid.draw_to_canvas`
+    phases : OrderedDict
+        Seconds spent in each phase in the order they were first
+        entered: 'copy', 'canvas', 'limits', 'frame', 'theme',
+        'reduce', 'draw', 'legend' and 'update' for drawing. Exports
+        add 'cache' and 'print_<format>'.
+    total : float
+        Wall time of the whole render in seconds
+    nplottables, npoints, nbins : int
+        Number of drawn plottables and the number of graph points and
+        histogram cells (incl. under- and overflow) they hold
+    """
+    def __init__(self, kind):
+        self.kind = kind
+        self.phases = OrderedDict()
+        self.total = None
+        self.nplottables = 0
+        self.npoints = 0
+        self.nbins = 0
+        self._start = default_timer()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Add the time spent in this context to the phase `name`
+        """
+        start = default_timer()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + default_timer() - start
+
+    def count(self, obj):
+        """
+        Account for a plottable which is drawn
+        """
+        self.nplottables += 1
+        if isinstance(obj, ROOT.TGraph):
+            self.npoints += obj.GetN()
+        elif isinstance(obj, ROOT.TH1):
+            self.nbins += _hist_ncells(obj)
+
+    def finish(self):
+        self.total = default_timer() - self._start
+
+    def as_dict(self):
+        """
+        Plain dict of this profile, eg. for json
+        """
+        return {'kind': self.kind, 'total': self.total, 'phases': dict(self.phases),
+                'nplottables': self.nplottables, 'npoints': self.npoints, 'nbins': self.nbins}
+
+    def __repr__(self):
+        phases = ", ".join("{0}={1:.2f}ms".format(name, t * 1000) for name, t in self.phases.items())
+        return "<RenderProfile {0}: {1:.2f}ms ({2})>".format(self.kind, (self.total or 0) * 1000, phases)
+
+
+class _NullPhase(object):
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class _NullProfile(object):
+    """
+    Stands in for a `RenderProfile` while profiling is off; does nothing
+    """
+    _phase = _NullPhase()
+
+    def __nonzero__(self):
+        return False
+    __bool__ = __nonzero__
+
+    def phase(self, name):
+        return self._phase
+
+    def count(self, obj):
+        pass
+
+
+NULL_PROFILE = _NullProfile()
+
+
+def add_render_hook(hook):
+    """
+    Call `hook(figure, profile)` after each render of any figure
+    """
+    _HOOKS.append(hook)
+
+
+def remove_render_hook(hook):
+    """
+    Unregister a hook previously added with `add_render_hook`
+    """
+    _HOOKS.remove(hook)
+
+
+def has_render_hooks():
+    return bool(_HOOKS)
+
+
+def run_render_hooks(fig, profile):
+    for hook in list(_HOOKS):
+        try:
+            hook(fig, profile)
+        except Exception as e:
+            # monitoring must not break the plotting
+            log.warning("Render hook {0} failed: {1}".format(hook, e))
@@ -0,0 +1,122 @@
+"""
+Long-lived render server which keeps ROOT and roofie loaded.
+
+Short scripts spend most of their time importing ROOT and rootpy
+before they draw a single figure. Start the server once, eg.
+
+    python -m roofie.server [--socket PATH]
+
+and submit figure specs with `roofie.client.RenderClient`, which does
+not need ROOT. The figures are drawn with the normal `Figure` code, one
+request at a time, and the paths of the written files are sent back.
+"""
+from __future__ import print_function
+
+import argparse
+import logging
+import os
+import platform
+import traceback
+
+try:
+    import socketserver
+except ImportError:
+    # python 2
+    import SocketServer as socketserver
+
+from ._root import ROOT
+from .client import default_socket_path, recv_message, send_message
+from .spec import figure_from_spec
+
+log = logging.getLogger("roofie.server")
+
+
+def handle_request(msg):
+    """
+    Response to a single request message; see `roofie.client` for the protocol
+    """
+    op = msg.get('op')
+    if op == 'render':
+        fig = figure_from_spec(msg['spec'])
+        paths = fig.export(msg['path'], msg['name'], formats=msg.get('formats') or ('pdf', ), dpi=msg.get('dpi'))
+        return {'ok': True, 'paths': paths}
+    if op == 'ping':
+        return {'ok': True, 'python': platform.python_version(), 'root': ROOT.gROOT.GetVersion()}
+    if op == 'shutdown':
+        return {'ok': True}
+    raise ValueError("Unknown operation '{0}'".format(op))
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """
+    Serves the requests of one connection until the client closes it
+    """
+    def handle(self):
+        while True:
+            try:
+                msg = recv_message(self.request)
+            except EOFError:
+                return
+            try:
+                response = handle_request(msg)
+            except Exception as e:
+                log.debug(traceback.format_exc())
+                response = {'ok': False, 'error': "{0}: {1}".format(type(e).__name__, e)}
+            send_message(self.request, response)
+            if msg.get('op') == 'shutdown':
+                self.server.stopping = True
+                return
+
+
+class RenderServer(socketserver.UnixStreamServer):
+    """
+    Render server listening on the Unix socket `socket_path`.
+
+    Connections are served one after another, since ROOT must not draw
+    from several threads at once. A stale socket file of a server which
+    is not running anymore is replaced.
+    """
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or default_socket_path()
+        self.stopping = False
+        if os.path.exists(self.socket_path):
+            from .client import server_running
+            if server_running(self.socket_path):
+                raise IOError("A render server is already listening on {0}".format(self.socket_path))
+            os.remove(self.socket_path)
+        socketserver.UnixStreamServer.__init__(self, self.socket_path, _Handler)
+        # only the current user may submit figures
+        os.chmod(self.socket_path, 0o600)
+
+    def serve(self):
+        """
+        Handle requests until a client asks for a shutdown
+        """
+        ROOT.gROOT.SetBatch(True)
+        log.info("Listening on {0}".format(self.socket_path))
+        try:
+            while not self.stopping:
+                self.handle_request()
+        finally:
+            self.server_close()
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--socket', default=default_socket_path(), help="Path of the Unix socket")
+    args = parser.parse_args()
+    try:
+        RenderServer(args.socket).serve()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,374 @@
+"""
+Figures as plain data ("specs") which can be pickled and sent to other processes.
+
+A spec is a dict holding all settings of a figure and the data of its
+plottables as NumPy arrays; it does not reference any ROOT object:
+
+    {'version': 1, 'title': ..., 'xtitle': ..., 'ytitle': ...,
+     'style': {'name': ..., 'settings': {...}},
+     'plot': {...}, 'legend': {...},
+     'plottables': [{'kind': 'hist' | 'graph' | 'function' | 'legend_entry',
+                     'options': {'legend_title': ..., ...}, ...}, ...]}
+
+ROOT is only loaded when converting from and to Figures, so that specs
+can be put together from arrays (eg. with `hist_spec` and `graph_spec`)
+in processes which never load ROOT.
+
+`dumps` and `loads` convert specs (or any nesting of dicts, lists,
+tuples, scalars, strings and arrays) from and to a compact binary
+format; see `Figure.to_spec` and `Figure.from_spec`. Its layout is
+
+    header: magic b'RFSP', format version (uint16), flags (uint16) and
+            the length of the json document (uint32), little endian
+    json:   {"arrays": [[dtype, shape, offset], ...], "spec": ...}
+            where each array is replaced by {"__array__": index}, each
+            tuple by {"__tuple__": [...]} and each dict which has any of
+            these keys itself by {"__dict__": {...}}
+    data:   the raw bytes of all arrays, each aligned to 8 bytes;
+            zlib compressed as a whole if flag 1 is set
+"""
+
+import json
+import struct
+import zlib
+
+import numpy as np
+
+from ._root import ROOT, asrootpy
+
+SPEC_VERSION = 1
+
+# Version of the binary layout written by `dumps`
+FORMAT_VERSION = 1
+_MAGIC = b'RFSP'
+_HEADER = struct.Struct('<4sHHI')
+_ALIGN = 8
+_FLAG_ZLIB = 1
+
+# Per-plottable options of a figure, see `Figure.add_plottable`
+_OPTIONS = ('legend_title', 'markerstyle', 'linestyle', 'color', 'use_as_frame')
+
+
+def _public_settings(obj):
+    """
+    Public, non-callable attributes of `obj` (incl. inherited ones) as a dict
+    """
+    settings = {}
+    for name in dir(obj):
+        if name.startswith('_'):
+            continue
+        value = getattr(obj, name)
+        if not callable(value):
+            settings[name] = value
+    return settings
+
+
+def _options(legend_title='', markerstyle=None, linestyle=None, color=None, use_as_frame=None):
+    return {'legend_title': legend_title, 'markerstyle': markerstyle, 'linestyle': linestyle,
+            'color': color, 'use_as_frame': use_as_frame}
+
+
+def hist_spec(edges, contents, sumw2=None, **options):
+    """
+    Spec of a 1D histogram
+
+    Parameters
+    ----------
+    edges : array
+        The `nbins + 1` bin edges
+    contents : array
+        Contents of the `nbins` bins or of all `nbins + 2` cells incl. under- and overflow
+    sumw2 : array
+        Sum of squared weights (ie. squared errors) in the same layout as `contents`
+    options :
+        Per-plottable options as for `Figure.add_plottable`
+    """
+    edges = np.array(edges, dtype=np.float64)
+    nbins = len(edges) - 1
+
+    def cells(arr):
+        arr = np.array(arr, dtype=np.float64)
+        if len(arr) == nbins:
+            arr = np.concatenate([[0.], arr, [0.]])
+        if len(arr) != nbins + 2:
+            raise ValueError("Expected {0} or {1} values, got {2}".format(nbins, nbins + 2, len(arr)))
+        return arr
+    contents = cells(contents)
+    entries = float(np.count_nonzero(contents))
+    return {'kind': 'hist', 'edges': edges, 'contents': contents,
+            'sumw2': None if sumw2 is None else cells(sumw2),
+            'error_option': 0, 'entries': entries, 'fill': None, 'options': _options(**options)}
+
+
+def graph_spec(x, y, exl=None, exh=None, eyl=None, eyh=None, **options):
+    """
+    Spec of a graph; missing errors are zero. Graphs with any asymmetric
+    errors are drawn as TGraphAsymmErrors, graphs without errors as TGraph.
+    """
+    x = np.array(x, dtype=np.float64)
+    zeros = np.zeros(len(x))
+    arrays = [np.array(err, dtype=np.float64) if err is not None else zeros for err in (exl, exh, eyl, eyh)]
+    if all(err is None for err in (exl, exh, eyl, eyh)):
+        cls = 'TGraph'
+    elif np.array_equal(arrays[0], arrays[1]) and np.array_equal(arrays[2], arrays[3]):
+        cls = 'TGraphErrors'
+    else:
+        cls = 'TGraphAsymmErrors'
+    return {'kind': 'graph', 'class': cls, 'x': x, 'y': np.array(y, dtype=np.float64),
+            'exl': arrays[0], 'exh': arrays[1], 'eyl': arrays[2], 'eyh': arrays[3],
+            'fill': None, 'options': _options(**options)}
+
+
+def _plottable_spec(rec):
+    """
+    Spec of the plottable of the `_PlottableRecord` rec; all arrays are copies
+    """
+    from .arrays import hist_edges, hist_contents, hist_errors, graph_arrays, function_parameters
+
+    obj = rec.p
+    options = dict((name, getattr(rec, name)) for name in _OPTIONS)
+    fill = (obj.GetFillColor(), obj.GetFillStyle()) if isinstance(obj, ROOT.TAttFill) else None
+    if isinstance(obj, ROOT.TH1):
+        if obj.GetDimension() != 1:
+            raise ValueError("Only 1D histograms can be stored in a spec")
+        contents = np.array(hist_contents(obj))
+        option = obj.GetBinErrorOption()
+        if isinstance(obj, ROOT.TProfile):
+            # store what is drawn: the means and their errors
+            sumw2, option = hist_errors(obj)[1] ** 2, ROOT.TH1.kNormal
+        elif option != ROOT.TH1.kNormal or obj.GetSumw2N() == 0:
+            # ROOT computes the errors from the contents
+            sumw2 = None
+        else:
+            sumw2 = hist_errors(obj)[1] ** 2
+        return {'kind': 'hist', 'edges': np.array(hist_edges(obj)), 'contents': contents, 'sumw2': sumw2,
+                'error_option': int(option), 'entries': obj.GetEntries(), 'fill': fill, 'options': options}
+    if isinstance(obj, ROOT.TGraph):
+        x, y, exl, exh, eyl, eyh = [np.array(arr) for arr in graph_arrays(obj)]
+        if isinstance(obj, ROOT.TGraphAsymmErrors):
+            cls = 'TGraphAsymmErrors'
+        elif isinstance(obj, ROOT.TGraphErrors):
+            cls = 'TGraphErrors'
+        else:
+            cls = 'TGraph'
+        return {'kind': 'graph', 'class': cls, 'x': x, 'y': y, 'exl': exl, 'exh': exh, 'eyl': eyl, 'eyh': eyh,
+                'fill': fill, 'options': options}
+    if isinstance(obj, ROOT.TF1):
+        return {'kind': 'function', 'title': obj.GetTitle(), 'formula': obj.GetExpFormula().Data(),
+                'xmin': obj.GetXmin(), 'xmax': obj.GetXmax(), 'npx': obj.GetNpx(),
+                'params': np.array(function_parameters(obj)), 'fill': fill, 'options': options}
+    if isinstance(obj, ROOT.TLegendEntry):
+        return {'kind': 'legend_entry', 'options': options}
+    raise ValueError("Cannot store a {0} in a spec".format(type(obj).__name__))
+
+
+def figure_to_spec(fig):
+    """
+    Snapshot of the given Figure as a spec. The data is copied, so the
+    figure may be changed right after this call.
+    """
+    style = fig.style
+    return {
+        'version': SPEC_VERSION,
+        'title': fig.title,
+        'xtitle': fig.xtitle,
+        'ytitle': fig.ytitle,
+        'style': {'name': style.__name__, 'settings': _public_settings(style)},
+        'plot': _public_settings(fig.plot),
+        'legend': _public_settings(fig.legend),
+        'plottables': [_plottable_spec(rec) for rec in fig._plottables],
+    }
+
+
+def _build_plottable(spec):
+    from .arrays import graph_from_arrays
+    from .figure import gen_random_name
+
+    kind = spec['kind']
+    if kind == 'hist':
+        edges = np.ascontiguousarray(spec['edges'], dtype=np.float64)
+        h = ROOT.TH1D(gen_random_name(), "", len(edges) - 1, edges)
+        h.SetDirectory(0)
+        h.SetContent(np.ascontiguousarray(spec['contents'], dtype=np.float64))
+        if spec['sumw2'] is not None:
+            h.Sumw2()
+            h.SetError(np.sqrt(np.ascontiguousarray(spec['sumw2'], dtype=np.float64)))
+        h.SetBinErrorOption(spec['error_option'])
+        h.SetEntries(spec['entries'])
+        obj = h
+    elif kind == 'graph':
+        if spec['class'] == 'TGraph':
+            arrays = (spec['x'], spec['y'])
+        elif spec['class'] == 'TGraphErrors':
+            arrays = (spec['x'], spec['y'], spec['exl'], spec['eyl'])
+        else:
+            arrays = tuple(spec[name] for name in ('x', 'y', 'exl', 'exh', 'eyl', 'eyh'))
+        obj = graph_from_arrays(arrays, gen_random_name())
+    elif kind == 'function':
+        obj = ROOT.TF1(gen_random_name(), spec['formula'], spec['xmin'], spec['xmax'])
+        obj.SetTitle(spec['title'])
+        obj.SetNpx(spec['npx'])
+        params = np.ascontiguousarray(spec['params'], dtype=np.float64)
+        if len(params):
+            obj.SetParameters(params)
+    elif kind == 'legend_entry':
+        return ROOT.TLegendEntry()
+    else:
+        raise ValueError("Unknown plottable kind '{0}'".format(kind))
+    if spec['fill'] is not None:
+        obj.SetFillColor(spec['fill'][0])
+        obj.SetFillStyle(spec['fill'][1])
+    return asrootpy(obj)
+
+
+def figure_from_spec(spec):
+    """
+    Create a Figure from a spec made by `figure_to_spec` (or by hand)
+    """
+    from .figure import Figure, Styles, _PlottableRecord
+
+    if spec.get('version') != SPEC_VERSION:
+        raise ValueError("Unsupported spec version {0}".format(spec.get('version')))
+    fig = Figure()
+    fig.title = spec.get('title', '')
+    fig.xtitle = spec.get('xtitle', '')
+    fig.ytitle = spec.get('ytitle', '')
+    if 'style' in spec:
+        name, settings = spec['style']['name'], spec['style']['settings']
+        style = getattr(Styles, name, None)
+        if style is None or _public_settings(style) != settings:
+            # a custom or modified style
+            style = type(str(name), (object, ), dict(settings))
+        fig.style = style
+    for name, value in spec.get('plot', {}).items():
+        setattr(fig.plot, name, value)
+    for name, value in spec.get('legend', {}).items():
+        setattr(fig.legend, name, value)
+    for pspec in spec['plottables']:
+        options = dict(_options(), **pspec.get('options', {}))
+        if not options['linestyle'] and pspec['kind'] != 'legend_entry':
+            # same defaults as `Figure.add_plottable`
+            options['linestyle'] = 0 if pspec['kind'] == 'hist' else 1
+        fig._add_record(_PlottableRecord(_build_plottable(pspec), **options))
+    return fig
+
+
+# keys of the json objects standing for values which json cannot represent
+_TAGS = ('__array__', '__tuple__', '__dict__')
+
+
+def _pack(obj, arrays):
+    """
+    json compatible version of `obj`; arrays are appended to `arrays` and replaced by their index
+    """
+    if isinstance(obj, dict):
+        packed = dict((k, _pack(v, arrays)) for k, v in obj.items())
+        if any(tag in obj for tag in _TAGS):
+            # would be taken for a tagged value otherwise
+            return {'__dict__': packed}
+        return packed
+    if isinstance(obj, list):
+        return [_pack(v, arrays) for v in obj]
+    if isinstance(obj, tuple):
+        # eg. `plot_margins`; json has no tuples
+        return {'__tuple__': [_pack(v, arrays) for v in obj]}
+    if isinstance(obj, np.ndarray):
+        arrays.append(obj)
+        return {'__array__': len(arrays) - 1}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def _unpack(obj, arrays):
+    if isinstance(obj, dict):
+        if '__array__' in obj:
+            return arrays[obj['__array__']]
+        if '__tuple__' in obj:
+            return tuple(_unpack(v, arrays) for v in obj['__tuple__'])
+        if '__dict__' in obj:
+            obj = obj['__dict__']
+        return dict((_native_str(k), _unpack(v, arrays)) for k, v in obj.items())
+    if isinstance(obj, list):
+        return [_unpack(v, arrays) for v in obj]
+    return _native_str(obj)
+
+
+def _native_str(obj):
+    # json gives unicode strings, which pyroot does not take in python 2
+    if isinstance(obj, type(u'')) and not isinstance(obj, str):
+        return obj.encode('utf-8')
+    return obj
+
+
+def dumps(spec, compress=False):
+    """
+    Serialize `spec` to the binary format described in the module docstring
+
+    Parameters
+    ----------
+    spec : dict
+        A spec as made by `figure_to_spec`
+    compress : bool
+        Compress the array data with zlib; worth it for sparse or repetitive data
+
+    Returns
+    -------
+    bytes :
+    """
+    arrays = []
+    doc = _pack(spec, arrays)
+    table = []
+    chunks = []
+    offset = 0
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        padding = -offset % _ALIGN
+        if padding:
+            chunks.append(b'\0' * padding)
+            offset += padding
+        table.append([arr.dtype.str, list(arr.shape), offset])
+        chunks.append(arr.tobytes())
+        offset += arr.nbytes
+    data = b''.join(chunks)
+    flags = 0
+    if compress:
+        data = zlib.compress(data, 1)
+        flags |= _FLAG_ZLIB
+    header = json.dumps({'arrays': table, 'spec': doc}, separators=(',', ':')).encode('utf-8')
+    # so that the data starts aligned as well
+    header += b' ' * (-(_HEADER.size + len(header)) % _ALIGN)
+    return _HEADER.pack(_MAGIC, FORMAT_VERSION, flags, len(header)) + header + data
+
+
+def loads(data):
+    """
+    Read a spec written by `dumps`
+
+    Raises
+    ------
+    ValueError :
+        If `data` is not a spec or was written by a newer version of roofie
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Not a roofie figure spec")
+    magic, version, flags, nheader = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC:
+        raise ValueError("Not a roofie figure spec")
+    if version > FORMAT_VERSION:
+        raise ValueError("Spec format version {0} is not supported by this version of roofie".format(version))
+    start = _HEADER.size + nheader
+    header = json.loads(data[_HEADER.size:start].decode('utf-8'))
+    if flags & _FLAG_ZLIB:
+        data, start = zlib.decompress(data[start:]), 0
+    arrays = []
+    for dtype, shape, offset in header['arrays']:
+        dtype = np.dtype(str(dtype))
+        count = int(np.prod(shape))
+        if count:
+            # copied, so that the result does not keep `data` alive and is writable
+            arr = np.frombuffer(data, dtype=dtype, count=count, offset=start + offset).reshape(shape).copy()
+        else:
+            arr = np.zeros(shape, dtype=dtype)
+        arrays.append(arr)
+    return _unpack(header['spec'], arrays)
@@ -0,0 +1,85 @@
+import os
+import shutil
+import unittest
+
+import numpy as np
+
+from rootpy.plotting import Hist1D
+
+from ROOT import TFile, TF1
+
+from roofie import Figure, Styles, flush
+from roofie.spec import figure_from_spec, figure_to_spec, hist_spec
+
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _make_figure(x):
+    fig = Figure()
+    fig.xtitle = "x"
+    h = Hist1D(10, 0, 10)
+    h.Fill(x, 2)
+    fig.add_plottable(h, legend_title="hist {0}".format(x))
+    fig.add_plottable((np.arange(3.), np.arange(3.), np.ones(3)))
+    fig.add_plottable(TF1("f", "[0]*x", 0, 10), legend_title="fit")
+    return fig
+
+
+class Test_spec(unittest.TestCase):
+    def test_roundtrip(self):
+        fig = _make_figure(3)
+        fig.style = Styles.Public_full
+        fig.plot.logy = True
+        fig.legend.position = 'tr'
+        loaded = figure_from_spec(figure_to_spec(fig))
+        self.assertEqual(loaded.xtitle, "x")
+        self.assertIs(loaded.style, Styles.Public_full)
+        self.assertTrue(loaded.plot.logy)
+        self.assertEqual(loaded.legend.position, 'tr')
+        self.assertEqual([rec.legend_title for rec in loaded._plottables], ["hist 3", '', "fit"])
+        h = loaded._plottables[0].p
+        self.assertEqual(h.GetBinContent(4), 2)
+        self.assertAlmostEqual(h.GetBinError(4), 2)
+        self.assertEqual(loaded._plottables[1].p.GetEY()[1], 1)
+        self.assertEqual(loaded._plottables[2].p.GetExpFormula().Data(), "[0]*x")
+
+    def test_snapshot_is_a_copy(self):
+        fig = _make_figure(3)
+        spec = figure_to_spec(fig)
+        fig._plottables[0].p.Fill(3)
+        self.assertEqual(spec['plottables'][0]['contents'][4], 2)
+
+    def test_hist_spec(self):
+        spec = hist_spec([0, 1, 2], [3, 4], legend_title="counts")
+        self.assertEqual(list(spec['contents']), [0, 3, 4, 0])
+        self.assertRaises(ValueError, hist_spec, [0, 1, 2], [3, 4, 5])
+
+
+class Test_save_async(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(test_dir, 'background_output')
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path)
+
+    def test_save_to_file_async(self):
+        futures = [_make_figure(x).save_to_file_async(self.path, "fig_{0}.pdf".format(x)) for x in range(3)]
+        self.assertEqual(flush(), 0)
+        for x, future in enumerate(futures):
+            self.assertTrue(future.done())
+            self.assertEqual(future.result(), os.path.join(self.path, "fig_{0}.pdf".format(x)))
+            self.assertTrue(os.path.exists(future.result()))
+
+    def test_failure_is_reported(self):
+        future = Figure().save_to_file_async(self.path, "empty.pdf")
+        self.assertEqual(flush(), 1)
+        self.assertIsNotNone(future.exception())
+        self.assertRaises(RuntimeError, future.result)
+
+    def test_save_to_root_file_async(self):
+        fname = os.path.join(self.path, 'figures.root')
+        for x in range(3):
+            _make_figure(x).save_to_root_file_async(fname, "fig_{0}".format(x), path='sub')
+        flush()
+        f = TFile.Open(fname)
+        self.assertEqual(sorted(k.GetName() for k in f.Get('sub').GetListOfKeys()), ['fig_0', 'fig_1', 'fig_2'])
+        f.Close()
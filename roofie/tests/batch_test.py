@@ -0,0 +1,98 @@
+import os
+import shutil
+import signal
+import time
+import unittest
+
+from rootpy.plotting import Hist1D
+
+from roofie import Figure, render_many
+from roofie import batch
+from roofie.batch import _run_tasks
+
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+class Test_render_many(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(test_dir, 'batch_output')
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def _make_figure(self, x):
+        fig = Figure()
+        h = Hist1D(10, 0, 10)
+        h.Fill(x)
+        fig.add_plottable(h, legend_title="hist {0}".format(x))
+        return fig
+
+    def test_render_in_order(self):
+        figs = [self._make_figure(x) for x in range(5)]
+        results = render_many(figs, self.path, workers=2, max_renders_per_worker=2)
+        self.assertEqual([r.index for r in results], list(range(5)))
+        for r in results:
+            self.assertTrue(r.success)
+            self.assertTrue(os.path.exists(r.path))
+
+    def test_failure_does_not_stop_others(self):
+        figs = [self._make_figure(1), Figure(), self._make_figure(2)]
+        results = render_many(figs, self.path, workers=2)
+        self.assertEqual([r.success for r in results], [True, False, True])
+        self.assertIn("IndexError", results[1].error)
+
+
+def _crash():
+    os.kill(os.getpid(), signal.SIGSEGV)
+
+
+def _hang():
+    time.sleep(60)
+
+
+class Test_run_tasks(unittest.TestCase):
+    def test_crashed_worker_is_replaced(self):
+        results = _run_tasks([lambda: 1, _crash, lambda: 3, lambda: 4], workers=1)
+        self.assertEqual([r[0] for r in results], [True, False, True, True])
+        self.assertEqual([r[1] for r in results], [1, None, 3, 4])
+        self.assertIn("worker died", results[1][2])
+
+    def test_timeout_kills_task(self):
+        start = time.time()
+        results = _run_tasks([_hang, lambda: 2], workers=1, timeout=.5)
+        self.assertLess(time.time() - start, 30)
+        self.assertEqual([r[0] for r in results], [False, True])
+        self.assertIn("timed out", results[0][2])
+
+    def test_workers_are_recycled(self):
+        results = _run_tasks([os.getpid] * 5, workers=1, max_tasks_per_worker=2)
+        pids = [value for success, value, error in results]
+        self.assertEqual(len(set(pids)), 3)
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_unpicklable_result(self):
+        results = _run_tasks([lambda: lambda: None, os.getpid, os.getpid], workers=1)
+        self.assertFalse(results[0][0])
+        self.assertIsNotNone(results[0][2])
+        self.assertNotIn("worker died", results[0][2])
+        # the worker keeps running
+        self.assertEqual(results[1][1], results[2][1])
+
+    def test_broken_pipe_is_a_dead_worker(self):
+        submit = batch._Worker.submit
+        calls = []
+
+        def broken_once(worker, index):
+            calls.append(index)
+            if len(calls) == 1:
+                worker.task = index
+                raise IOError("Broken pipe")
+            submit(worker, index)
+        batch._Worker.submit = broken_once
+        try:
+            results = _run_tasks([lambda: 1, lambda: 2], workers=1)
+        finally:
+            batch._Worker.submit = submit
+        self.assertEqual(results[0][0], False)
+        self.assertIn("worker died", results[0][2])
+        self.assertEqual(results[1], (True, 2, None))
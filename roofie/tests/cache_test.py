@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from rootpy.plotting import Hist1D
+
+from ROOT import TF1
+
+from roofie import Figure
+from roofie.cache import RenderCache, figure_digest
+
+
+class Test_figure_digest(unittest.TestCase):
+    def _make_figure(self, x):
+        fig = Figure()
+        h = Hist1D(10, 0, 10)
+        h.Fill(x)
+        fig.add_plottable(h, legend_title="hist")
+        return fig
+
+    def test_same_content_same_digest(self):
+        self.assertEqual(figure_digest(self._make_figure(1)), figure_digest(self._make_figure(1)))
+
+    def test_digest_depends_on_data_and_settings(self):
+        fig = self._make_figure(1)
+        digest = figure_digest(fig)
+        self.assertNotEqual(digest, figure_digest(self._make_figure(2)))
+        fig.plot.logy = True
+        self.assertNotEqual(digest, figure_digest(fig))
+
+    def test_digest_depends_on_attributes(self):
+        digest = figure_digest(self._make_figure(1))
+        fig = self._make_figure(1)
+        fig._plottables[0].p.SetLineWidth(5)
+        self.assertNotEqual(digest, figure_digest(fig))
+        fig = self._make_figure(1)
+        fig._plottables[0].p.GetXaxis().SetNdivisions(3)
+        self.assertNotEqual(digest, figure_digest(fig))
+
+        def with_function(width):
+            fig = self._make_figure(1)
+            f = TF1("f", "x", 0, 10)
+            f.SetLineWidth(width)
+            fig.add_plottable(f, markerstyle=None)
+            return figure_digest(fig)
+        self.assertNotEqual(with_function(1), with_function(4))
+
+    def test_digest_is_stable_when_drawing(self):
+        fig = self._make_figure(1)
+        fig.add_plottable(TF1("f", "x", 0, 10), markerstyle=None)
+        digest = figure_digest(fig)
+        fig.draw_to_canvas()
+        self.assertEqual(digest, figure_digest(fig))
+
+
+class Test_RenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = RenderCache(os.path.join(self.tmp, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_hit_and_miss(self):
+        fig = Figure()
+        fig.render_cache = self.cache
+        h = Hist1D(10, 0, 10)
+        h.Fill(5)
+        fig.add_plottable(h)
+        fig.save_to_file(self.tmp, 'first.pdf')
+        fig.save_to_file(self.tmp, 'second.pdf')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, 'second.pdf')))
+
+    def test_lru_eviction(self):
+        self.cache.max_bytes = 150
+        src = os.path.join(self.tmp, 'src')
+        with open(src, 'w') as f:
+            f.write('x' * 100)
+        self.cache.store('a', 'pdf', src)
+        self.cache.store('b', 'pdf', src)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertIsNone(self.cache.lookup('a', 'pdf'))
+        self.assertIsNotNone(self.cache.lookup('b', 'pdf'))
+
+    def test_store_again_replaces_entry(self):
+        src = os.path.join(self.tmp, 'src')
+        with open(src, 'w') as f:
+            f.write('x' * 100)
+        for _ in range(3):
+            self.cache.store('a', 'pdf', src)
+        self.assertEqual(self.cache._nbytes, 100)
+        self.assertEqual(self.cache.nbytes(), 100)
@@ -0,0 +1,98 @@
+import unittest
+
+import numpy as np
+
+import ROOT
+
+from rootpy.plotting import Hist1D
+
+from roofie import Figure, get_color_generator
+from roofie.colors import (husl_to_rgb, rgb_to_husl, husl_palette, colormap, set_root_palette,
+                           COLORMAPS, ColorRegistry, color_registry)
+from roofie.external import husl
+
+
+class Test_conversions(unittest.TestCase):
+    def test_matches_scalar_implementation(self):
+        rng = np.random.RandomState(42)
+        hsl = np.column_stack([rng.uniform(0, 360, 100), rng.uniform(0, 100, 100), rng.uniform(1, 99, 100)])
+        expected = np.array([husl.husl_to_rgb(*row) for row in hsl])
+        np.testing.assert_allclose(husl_to_rgb(hsl), expected, atol=1e-12)
+
+    def test_round_trip(self):
+        rgb = np.random.RandomState(1).uniform(0, 1, (50, 3))
+        # the rounded matrices of the reference implementation are not exact inverses
+        np.testing.assert_allclose(husl_to_rgb(rgb_to_husl(rgb)), rgb, atol=1e-3)
+
+    def test_black_and_white(self):
+        np.testing.assert_allclose(rgb_to_husl([0, 0, 0]), [0, 0, 0])
+        np.testing.assert_allclose(husl_to_rgb([0, 0, 100]), [1, 1, 1], atol=1e-3)
+
+
+class Test_palettes(unittest.TestCase):
+    def test_husl_palette(self):
+        palette = husl_palette(10)
+        self.assertEqual(len(palette), 10)
+        # the first color of seaborn's default husl palette
+        np.testing.assert_allclose(palette[0], (0.9677975592919913, 0.44127456009157356, 0.5358103155058701))
+        self.assertIs(husl_palette(10), palette)
+
+    def test_many_distinct_colors(self):
+        for palette in ('root', 'colorblind', 'set2', 'husl'):
+            colors = list(get_color_generator(palette, 300))
+            self.assertEqual(len(colors), 300)
+            self.assertEqual(len(set(colors)), 300)
+
+    def test_colormaps(self):
+        for name in COLORMAPS:
+            cmap = colormap(name, 64)
+            self.assertEqual(cmap.shape, (64, 3))
+            self.assertTrue(((cmap >= 0) & (cmap <= 1)).all())
+        self.assertRaises(ValueError, colormap, 'nope')
+
+    def test_root_palette_is_created_once(self):
+        ncolors = ROOT.gROOT.GetListOfColors().GetSize()
+        first = set_root_palette('sequential', 50)
+        after_first = ROOT.gROOT.GetListOfColors().GetSize()
+        self.assertGreater(after_first, ncolors)
+        self.assertEqual(set_root_palette('sequential', 50), first)
+        self.assertEqual(ROOT.gROOT.GetListOfColors().GetSize(), after_first)
+        self.assertEqual(ROOT.TColor.GetColorPalette(0), first)
+
+
+class Test_color_registry(unittest.TestCase):
+    def test_each_color_is_allocated_once(self):
+        registry = ColorRegistry()
+        idx = registry.index((0.1, 0.2, 0.3))
+        self.assertEqual(registry.index((0.1, 0.2, 0.3)), idx)
+        self.assertEqual(registry.index(5), 5)
+        self.assertNotEqual(registry.index((0.1, 0.2, 0.3, 0.5)), idx)
+        self.assertEqual(len(registry), 2)
+        self.assertEqual(registry.hits, 1)
+        self.assertEqual(registry.misses, 2)
+        self.assertRaises(ValueError, registry.index, (0.1, 0.2))
+
+    def test_sequences_use_the_registry(self):
+        fig = Figure()
+        fig.add_plottable(Hist1D(10, 0, 10), color=(0.3, 0.6, 0.9))
+        fig.add_plottable(Hist1D(10, 0, 10), color=[0.3, 0.6, 0.9])
+        fig.add_plottable(Hist1D(10, 0, 10), color=np.array([0.3, 0.6, 0.9]))
+        fig.draw_to_canvas()
+        idx = color_registry.index((0.3, 0.6, 0.9))
+        self.assertEqual([rec.p.GetLineColor() for rec in fig._plottables], [idx] * 3)
+
+    def test_bounded_over_many_renders(self):
+        def render():
+            fig = Figure()
+            fig.plot.palette = 'husl'
+            for i in range(5):
+                fig.add_plottable(Hist1D(10, 0, 10))
+            fig.add_plottable(Hist1D(10, 0, 10), color=(0.5, 0.5, 0.5))
+            fig.draw_to_canvas()
+        render()
+        ncolors = ROOT.gROOT.GetListOfColors().GetSize()
+        size = len(color_registry)
+        for _ in range(50):
+            render()
+        self.assertEqual(ROOT.gROOT.GetListOfColors().GetSize(), ncolors)
+        self.assertEqual(len(color_registry), size)
@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+from ROOT import TGraph, TGraphErrors, TH1
+from rootpy.plotting import Hist1D
+
+from roofie import Figure
+from roofie.arrays import graph_arrays, hist_contents, hist_errors
+from roofie.display import decimate_graph, rebin_hist
+
+
+def _make_graph(n, cls=TGraph):
+    x = np.linspace(0, 10, n)
+    y = np.sin(x) + np.random.RandomState(0).normal(scale=.1, size=n)
+    if cls is TGraphErrors:
+        return cls(n, x, y, np.zeros(n), np.full(n, .1))
+    return cls(n, x, y)
+
+
+class Test_decimate_graph(unittest.TestCase):
+    def test_methods_reduce_points(self):
+        g = _make_graph(100000)
+        for method in ['pixels', 'minmax', 'lttb']:
+            reduced = decimate_graph(g, method, (0, 10, -2, 2), (False, False), (300, 200))
+            self.assertLess(reduced.GetN(), 2 * 300 * 200)
+            self.assertLess(reduced.GetN(), g.GetN())
+            # the original is untouched
+            self.assertEqual(g.GetN(), 100000)
+
+    def test_minmax_keeps_extrema(self):
+        g = _make_graph(100000)
+        reduced = decimate_graph(g, 'minmax', (0, 10, -2, 2), (False, False), (300, 200))
+        y, y_reduced = graph_arrays(g)[1], graph_arrays(reduced)[1]
+        self.assertEqual(y.max(), y_reduced.max())
+        self.assertEqual(y.min(), y_reduced.min())
+
+    def test_keeps_errors_and_small_graphs(self):
+        g = _make_graph(100000, TGraphErrors)
+        reduced = decimate_graph(g, 'lttb', (0, 10, -2, 2), (False, False), (300, 200))
+        self.assertIsInstance(reduced, TGraphErrors)
+        small = _make_graph(100)
+        self.assertIs(decimate_graph(small, 'lttb', (0, 10, -2, 2), (False, False), (300, 200)), small)
+
+    def test_nothing_visible_on_log_axis(self):
+        n = 10000
+        g = TGraph(n, np.linspace(0, 10, n), -np.ones(n))
+        for method in ['pixels', 'minmax', 'lttb']:
+            self.assertIs(decimate_graph(g, method, (0, 10, 1e-3, 1), (False, True), (300, 200)), g)
+
+    def test_figure_draws_reduced_copy(self):
+        fig = Figure()
+        fig.plot.decimate = 'minmax'
+        fig.add_plottable(_make_graph(100000))
+        c = fig.draw_to_canvas()
+        graphs = [p for p in c.FindObject("plot").GetListOfPrimitives()
+                  if isinstance(p, TGraph) and p.GetName() != "__frame"]
+        self.assertLess(graphs[0].GetN(), 100000)
+        self.assertEqual(fig._plottables[0].p.GetN(), 100000)
+
+
+class Test_rebin_hist(unittest.TestCase):
+    def setUp(self):
+        self.h = Hist1D(100000, 0, 10)
+        self.h.FillRandom('gaus', 100000)
+
+    def test_contents_and_errors(self):
+        reduced = rebin_hist(self.h, (0, 10), False, 300)
+        self.assertLessEqual(reduced.GetNbinsX(), 300)
+        self.assertAlmostEqual(hist_contents(reduced).sum(), hist_contents(self.h)[1:-1].sum())
+        err_sq = (hist_errors(reduced)[0] ** 2).sum()
+        self.assertAlmostEqual(err_sq, (hist_errors(self.h)[0][1:-1] ** 2).sum())
+
+    def test_only_visible_window(self):
+        reduced = rebin_hist(self.h, (2, 4), False, 300)
+        self.assertAlmostEqual(reduced.GetXaxis().GetXmin(), 2)
+        self.assertAlmostEqual(reduced.GetXaxis().GetXmax(), 4)
+        self.assertAlmostEqual(reduced.Integral(), self.h.Integral(self.h.FindBin(2.00001), self.h.FindBin(3.99999)))
+
+    def test_coarse_hist_untouched(self):
+        h = Hist1D(10, 0, 10)
+        self.assertIs(rebin_hist(h, (0, 10), False, 300), h)
+
+    def test_poisson_errors(self):
+        self.h.SetBinErrorOption(TH1.kPoisson)
+        reduced = rebin_hist(self.h, (0, 10), False, 300)
+        self.assertEqual(reduced.GetBinErrorOption(), TH1.kPoisson)
@@ -0,0 +1,104 @@
+import os
+import shutil
+import unittest
+
+from ROOT import TLegend
+from rootpy.plotting import Hist1D
+
+from roofie import Beamerdoc, Figure, FigureGrid, Styles
+
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _make_figure(mean):
+    fig = Figure()
+    fig.style = Styles.Public_full
+    h = Hist1D(20, -5 + mean, 5 + mean)
+    h.FillRandom('gaus', 100)
+    fig.add_plottable(h, legend_title="mean {0}".format(mean))
+    return fig
+
+
+class Test_FigureGrid(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(test_dir, 'grid_output')
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.grid = FigureGrid(2, 3)
+        for row in range(2):
+            for col in range(3):
+                self.grid[row, col] = _make_figure(row + col)
+
+    def test_shared_ranges(self):
+        limits = self.grid._limits()
+        for row in range(2):
+            self.assertEqual(len(set(limits[row, col][2:] for col in range(3))), 1)
+        for col in range(3):
+            self.assertEqual(len(set(limits[row, col][:2] for row in range(2))), 1)
+        self.assertEqual(limits[0, 0][:2], (-5, 6))
+
+    def test_share_all(self):
+        self.grid.sharex = self.grid.sharey = 'all'
+        limits = self.grid._limits()
+        self.assertEqual(len(set(limits.values())), 1)
+        self.assertEqual(FigureGrid(2, 2, sharex=True, sharey=False).sharex, 'all')
+        self.assertRaises(ValueError, FigureGrid, 2, 2, sharex='rows')
+
+    def test_mixed_log_axes(self):
+        self.grid[0, 1].plot.logy = True
+        self.assertRaises(ValueError, self.grid._limits)
+        # fine if the log cell is in a row of its own
+        self.grid.sharey = False
+        limits = self.grid._limits()
+        self.assertGreater(limits[0, 1][2], 0)
+
+    def test_single_canvas(self):
+        c = self.grid.draw_to_canvas()
+        pads = [p for p in c.GetListOfPrimitives() if p.GetName().startswith('cell_')]
+        self.assertEqual(len(pads), 6)
+        # the figures keep their own style
+        self.assertIs(self.grid[0, 0].style, Styles.Public_full)
+
+    def test_separate_legend_goes_into_the_cell(self):
+        fig = self.grid[0, 0]
+        fig.legend.position = 'seperate'
+        c = self.grid.draw_to_canvas()
+        pad = c.FindObject("cell_0_0")
+        legends = [p for p in pad.GetListOfPrimitives() if isinstance(p, TLegend)]
+        self.assertEqual(len(legends), 1)
+        # in the top right corner of the cell, not at the default coordinates
+        self.assertGreater(legends[0].GetX1NDC(), .5)
+        self.assertGreater(legends[0].GetY1NDC(), .5)
+        self.assertEqual(fig.legend.position, 'seperate')
+
+    def test_figures_reusing_their_canvas(self):
+        fig = self.grid[0, 0]
+        fig.reuse_canvas = True
+        c = fig.draw_to_canvas()
+        drawn, frame = list(fig._drawn), fig._reusable_frame
+        for _ in range(3):
+            self.grid.draw_to_canvas()
+        # the grid neither adds to nor takes over what the figure keeps for its own canvas
+        self.assertEqual(len(fig._drawn), len(drawn))
+        self.assertIs(fig._reusable_frame, frame)
+        self.assertTrue(fig.reuse_canvas)
+        self.assertIs(fig.draw_to_canvas(), c)
+
+    def test_export(self):
+        written = self.grid.export(self.path, 'grid', formats=['pdf', 'png'])
+        self.assertEqual(len(written), 2)
+        for path in written:
+            self.assertTrue(os.path.exists(path))
+
+    def test_bad_cells(self):
+        self.assertRaises(IndexError, self.grid.__setitem__, (2, 0), Figure())
+        self.grid[1, 1] = Figure()
+        self.assertRaises(IndexError, self.grid.draw_to_canvas)
+
+    def test_beamer(self):
+        doc = Beamerdoc("Author", "Grid")
+        doc.output_dir = os.path.join(self.path, 'beamer')
+        sec = doc.add_section("Grids")
+        sec.add_figure(self.grid)
+        paths, nwritten = doc._write_figures_to_disc()
+        self.assertEqual(nwritten, 1)
+        self.assertTrue(os.path.exists(os.path.join(doc.output_dir, paths[0][0])))
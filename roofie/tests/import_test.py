@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import unittest
+
+test_dir = os.path.dirname(os.path.abspath(__file__))
+package_dir = os.path.dirname(os.path.dirname(test_dir))
+
+
+def _run(code):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([package_dir] + [p for p in [env.get('PYTHONPATH')] if p])
+    return subprocess.check_output([sys.executable, '-c', code], env=env).decode('ascii').split()
+
+
+class Test_import(unittest.TestCase):
+    def test_import_does_not_load_root(self):
+        out = _run("import sys\n"
+                   "import logging\n"
+                   "import roofie\n"
+                   "fig = roofie.Figure()\n"
+                   "fig.style = roofie.Styles.Public_full\n"
+                   "fig.plot.logy = True\n"
+                   "roofie.set_batch(True)\n"
+                   "print('{0} {1} {2}'.format('ROOT' in sys.modules, 'rootpy' in sys.modules,\n"
+                   "                         len(logging.getLogger().handlers)))\n")
+        self.assertEqual(out, ['False', 'False', '0'])
+
+    def test_root_is_loaded_on_first_draw(self):
+        out = _run("import sys\n"
+                   "import numpy as np\n"
+                   "import roofie\n"
+                   "roofie.set_batch(True)\n"
+                   "fig = roofie.Figure()\n"
+                   "fig.add_plottable((np.arange(3.), np.arange(3.)))\n"
+                   "fig.draw_to_canvas()\n"
+                   "import ROOT\n"
+                   "print(ROOT.gROOT.IsBatch())\n")
+        self.assertEqual(out, ['True'])
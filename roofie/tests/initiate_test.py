@@ -2,6 +2,8 @@ import os
 import unittest
 import shutil
 
+import numpy as np
+
 from rootpy.plotting import Hist1D, Graph, Canvas
 
 from rootpy.io import File
@@ -31,14 +33,14 @@ class Test_Figure(unittest.TestCase):
         self.assertNotEqual(h, f._plottables[0])
 
         # add histogram with legend
-        legend_labels = [pdic['legend_title'] for pdic in f._plottables if pdic['legend_title'] != '']
+        legend_labels = [rec.legend_title for rec in f._plottables if rec.legend_title != '']
         self.assertEqual(len(legend_labels), 0)
         f.add_plottable(h, legend_title="cool hist")
-        legend_labels = [pdic['legend_title'] for pdic in f._plottables if pdic['legend_title'] != '']
+        legend_labels = [rec.legend_title for rec in f._plottables if rec.legend_title != '']
         self.assertEqual(len(legend_labels), 1)
         # add additional legend entry without plottable
         f.add_plottable(None, legend_title="legend without plottable", markerstyle=20, color=20)
-        legend_labels = [pdic['legend_title'] for pdic in f._plottables if pdic['legend_title'] != '']
+        legend_labels = [rec.legend_title for rec in f._plottables if rec.legend_title != '']
         self.assertEqual(len(legend_labels), 2)
 
         # no old plottables if I make a new one:
@@ -52,6 +54,95 @@ class Test_Figure(unittest.TestCase):
         f.delete_plottables()
         self.assertEqual(len(f._plottables), 0)
 
+    def test_plottable_indices(self):
+        f = Figure()
+        h = Hist1D(10, 0, 10)
+        f.add_plottable(h)
+        f.add_plottable(h, legend_title="frame", use_as_frame=True)
+        f.add_plottable(None, legend_title="legend only")
+        self.assertEqual(f._nlegend_entries, 2)
+        self.assertIs(f._frame_record, f._plottables[1])
+        self.assertFalse(hasattr(f._plottables[0], '__dict__'))
+        f.delete_plottables()
+        self.assertEqual(f._nlegend_entries, 0)
+        self.assertIsNone(f._frame_record)
+
+    def test_add_plottable_by_reference(self):
+        f = Figure()
+        h = Hist1D(1000, 0, 10)
+        h.Fill(5)
+        f.add_plottable(h, copy=False)
+        self.assertIs(f._plottables[0].p, h)
+        self.assertLess(f.memory_usage(), 1000 * 8)
+        self.assertGreater(f.memory_usage(include_references=True), 1000 * 8)
+        # a temporary copy is drawn; the figure keeps holding the reference only
+        c = f.draw_to_canvas()
+        self.assertIs(f._plottables[0].p, h)
+        self.assertLess(f.memory_usage(), 1000 * 8)
+        drawn = [p for p in c.FindObject("plot").GetListOfPrimitives() if isinstance(p, ROOT.TH1)]
+        self.assertEqual(len(drawn), 1)
+        self.assertNotEqual(drawn[0].GetName(), h.GetName())
+        # changes of the source show up in the next draw
+        h.Fill(5)
+        c = f.draw_to_canvas()
+        drawn = [p for p in c.FindObject("plot").GetListOfPrimitives() if isinstance(p, ROOT.TH1)]
+        self.assertEqual(drawn[0].GetBinContent(h.FindBin(5)), 2)
+
+    def test_add_numpy_arrays(self):
+        f = Figure()
+        x = np.linspace(0, 1, 1000)
+        f.add_plottable((x, x ** 2), legend_title='graph')
+        f.add_plottable((x, x, np.full(1000, .1)))
+        f.add_plottable((x, x, np.vstack([np.full(1000, .1), np.full(1000, .2)])))
+        f.add_plottable((x, x, x, x, x, x))
+        classes = [rec.p.ClassName() for rec in f._plottables]
+        self.assertEqual(classes, ['TGraph', 'TGraphErrors', 'TGraphAsymmErrors', 'TGraphAsymmErrors'])
+        g = f._plottables[2].p
+        self.assertEqual(g.GetN(), 1000)
+        self.assertAlmostEqual(g.GetY()[10], x[10])
+        self.assertAlmostEqual(g.GetErrorYhigh(10), .2)
+        self.assertAlmostEqual(g.GetErrorXlow(10), 0)
+        self.assertRaises(ValueError, f.add_plottable, (x, x[:-1]))
+        self.assertRaises(ValueError, f.add_plottable, (x, ))
+        f.draw_to_canvas()
+
+
+class Test_reuse_canvas(unittest.TestCase):
+    def _fill(self, f, x):
+        f.delete_plottables()
+        h = Hist1D(10, 0, 10)
+        h.Fill(x)
+        f.add_plottable(h, legend_title="hist {0}".format(x))
+
+    def test_canvas_is_reused(self):
+        f = Figure()
+        f.reuse_canvas = True
+        self._fill(f, 1)
+        c1 = f.draw_to_canvas()
+        nprimitives = c1.FindObject('plot').GetListOfPrimitives().GetSize()
+        frame = c1.FindObject('__frame')
+        self._fill(f, 2)
+        f.plot.ymax = 5
+        c2 = f.draw_to_canvas()
+        self.assertIs(c1, c2)
+        pad = c2.FindObject('plot')
+        self.assertEqual(pad.GetListOfPrimitives().GetSize(), nprimitives)
+        self.assertEqual(c2.FindObject('__frame'), frame)
+        self.assertAlmostEqual(frame.GetMaximum(), 5)
+        hists = [p for p in pad.GetListOfPrimitives() if isinstance(p, ROOT.TH1)]
+        self.assertEqual(len(hists), 1)
+        self.assertEqual(hists[0].GetBinContent(3), 1)
+
+    def test_new_canvas_if_layout_changes(self):
+        f = Figure()
+        f.reuse_canvas = True
+        self._fill(f, 1)
+        c1 = f.draw_to_canvas()
+        f.legend.position = 'seperate'
+        c2 = f.draw_to_canvas()
+        self.assertIsNot(c1, c2)
+        self.assertNotEqual(c2.FindObject('legend'), None)
+
 
 class Test_draw_to_canvas(unittest.TestCase):
     def test_draw_without_plottables(self):
@@ -289,6 +380,44 @@ class Test_write_to_pdf_file(unittest.TestCase):
         os.chdir(old_cwd)
 
 
+class Test_export(unittest.TestCase):
+    def setUp(self):
+        self.fig = Figure()
+        h1 = Hist1D(10, 0, 10)
+        h1.Fill(5)
+        self.fig.add_plottable(h1, legend_title="hist 1")
+        self.path = os.path.dirname(os.path.realpath(__file__)) + '/export'
+        shutil.rmtree(self.path, ignore_errors=True)
+        # count the draws
+        self.ndraws = 0
+        draw_to_canvas = self.fig.draw_to_canvas
+
+        def counting_draw():
+            self.ndraws += 1
+            return draw_to_canvas()
+        self.fig.draw_to_canvas = counting_draw
+
+    def test_draw_once_for_all_formats(self):
+        paths = self.fig.export(self.path, 'fig', formats=['pdf', 'png', 'svg', 'root'], dpi=300)
+        self.assertEqual(self.ndraws, 1)
+        for path in paths:
+            self.assertTrue(os.path.exists(path))
+
+    def test_canvas_is_not_kept(self):
+        self.fig.export(self.path, 'fig')
+        self.fig.export(self.path, 'fig')
+        self.assertEqual(self.ndraws, 2)
+        f = File(self.path + "/test.root", "recreate")
+        self.fig.save_to_root_file(f, 'myname')
+        f.Close()
+        f = File(self.path + "/test.root")
+        self.assertTrue(f.Get('myname'))
+        f.Close()
+
+    def test_unknown_format(self):
+        self.assertRaises(NotImplementedError, self.fig.save_to_file, self.path, 'fig.xyz')
+
+
 class Test_Size_of_figures_corresponds_to_latex(unittest.TestCase):
     def setUp(self):
         self.fig = Figure()
@@ -376,7 +505,7 @@ class Test_import_from_canvas(unittest.TestCase):
         fig = Figure()
         fig.import_plottables_from_canvas(self.canvas)
         self.assertEqual(len(fig._plottables), 1)
-        self.assertIsInstance(fig._plottables[0], dict)
+        self.assertEqual(fig._plottables[0].legend_title, "hist 1")
         fig.draw_to_canvas()
 
         # make a pdf for visual comparison
@@ -386,6 +515,14 @@ class Test_import_from_canvas(unittest.TestCase):
         sec.add_figure(fig)
         latexdoc.finalize_document("test_imports.tex")
 
+    def test_import_without_legend(self):
+        orig = Figure()
+        orig.add_plottable(Hist1D(10, 0, 10))
+        fig = Figure()
+        fig.import_plottables_from_canvas(orig.draw_to_canvas())
+        self.assertEqual(len(fig._plottables), 1)
+        self.assertEqual(fig._plottables[0].legend_title, '')
+
     def test_import_non_roofie_canvas(self):
         fig = Figure()
         c = Canvas()
@@ -416,6 +553,62 @@ class Test_beamify_add_canvas(unittest.TestCase):
         sec.add_figure(fig)
         latexdoc.finalize_document("test_add_canvas.tex")
 
+    def test_parallel_figure_writing(self):
+        latexdoc = Beamerdoc("Christian Bourjau", "Test parallel")
+        for sec_title in ["First", "Second"]:
+            sec = latexdoc.add_section(sec_title)
+            for i in range(3):
+                fig = Figure()
+                h1 = Hist1D(10, 0, 10)
+                h1.Fill(i)
+                fig.add_plottable(h1, legend_title="hist {0}".format(i))
+                sec.add_figure(fig)
+        # a figure without plottables fails, but must not stop the others
+        sec.add_figure(Figure())
+        paths, nwritten = latexdoc._write_figures_to_disc(jobs=2)
+        self.assertEqual([len(p) for p in paths], [3, 4])
+        self.assertIsNone(paths[1][3])
+        for path in paths[0] + paths[1][:3]:
+            self.assertTrue(os.path.exists(os.path.join(latexdoc.output_dir, path)))
+
+    def test_incremental_rebuild(self):
+        latexdoc = Beamerdoc("Christian Bourjau", "Test incremental")
+        sec = latexdoc.add_section("Section")
+        fig = Figure()
+        h1 = Hist1D(10, 0, 10)
+        h1.Fill(5)
+        fig.add_plottable(h1, legend_title="hist 1")
+        sec.add_figure(fig)
+        paths, nwritten = latexdoc._write_figures_to_disc()
+        # same content gives the same file which is not written again
+        self.assertEqual(latexdoc._write_figures_to_disc(), (paths, 0))
+
+        # changed content gives a new file and the old one is removed
+        sec.figures = []
+        fig2 = Figure()
+        h1.Fill(2)
+        fig2.add_plottable(h1, legend_title="hist 1")
+        sec.add_figure(fig2)
+        new_paths, nwritten = latexdoc._write_figures_to_disc()
+        self.assertEqual(nwritten, 1)
+        self.assertNotEqual(paths, new_paths)
+        self.assertFalse(os.path.exists(os.path.join(latexdoc.output_dir, paths[0][0])))
+
+    def test_duplicate_figures_are_written_once(self):
+        latexdoc = Beamerdoc("Christian Bourjau", "Test duplicates")
+        sec = latexdoc.add_section("Section")
+        for i in range(4):
+            fig = Figure()
+            h1 = Hist1D(10, 0, 10)
+            h1.Fill(5)
+            fig.add_plottable(h1, legend_title="hist 1")
+            sec.add_figure(fig)
+        sec.add_figure(fig)
+        paths, nwritten = latexdoc._write_figures_to_disc(jobs=2)
+        self.assertEqual(nwritten, 1)
+        self.assertEqual(len(set(paths[0])), 1)
+        self.assertTrue(os.path.exists(os.path.join(latexdoc.output_dir, paths[0][0])))
+
 
 class Test_complicated_plot_for_visual_comparison(unittest.TestCase):
     def test_busy_plot(self):
@@ -0,0 +1,47 @@
+import unittest
+
+from ROOT import TF1
+from rootpy.plotting import Hist1D, Graph
+
+from roofie.limits import get_limits
+
+
+class Test_get_limits(unittest.TestCase):
+    def test_hist_snaps_to_zero(self):
+        h = Hist1D(10, 0, 10)
+        h.Fill(5, 9)
+        xmin, xmax, ymin, ymax = get_limits([h])
+        self.assertEqual((xmin, xmax, ymin), (0, 10, 0))
+        # 10% padding on top of content + error
+        self.assertAlmostEqual(ymax, 18 / 0.9)
+
+    def test_ignores_functions_and_empty_graphs(self):
+        f = TF1("f", "sin(x)", 0, 1)
+        self.assertEqual(get_limits([f, Graph()]), (None, None, None, None))
+        h = Hist1D(10, 0, 10)
+        h.Fill(5)
+        self.assertEqual(get_limits([f, Graph(), h])[:2], (0, 10))
+
+    def test_log_uses_positive_minimum(self):
+        gr = Graph(3)
+        for i, (x, y) in enumerate([(-1, 0), (1, 1e-3), (10, 1e2)]):
+            gr.SetPoint(i, x, y)
+        xmin, xmax, ymin, ymax = get_limits([gr], logx=True, logy=True)
+        self.assertEqual((xmin, xmax), (1, 10))
+        self.assertLess(ymin, 1e-3)
+        self.assertGreater(ymin, 0)
+
+    def test_percentiles_ignore_outliers(self):
+        gr = Graph(101)
+        for i in range(100):
+            gr.SetPoint(i, i, 1)
+        gr.SetPoint(100, 100, 1e6)
+        ymax = get_limits([gr], percentiles=(0, 99))[3]
+        self.assertLess(ymax, 10)
+
+    def test_percentiles_keep_bin_edges(self):
+        h = Hist1D(100, 0, 100)
+        for i in range(100):
+            h.Fill(i + .5)
+        xmin, xmax = get_limits([h], percentiles=(5, 95))[:2]
+        self.assertEqual((xmin, xmax), (0, 100))
@@ -0,0 +1,49 @@
+import os
+import shutil
+import unittest
+
+from rootpy.plotting import Hist1D
+
+from ROOT import TCanvas, TFile
+
+from roofie import Figure, RootFileWriter, iter_figures
+
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+class Test_iter_figures(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(test_dir, 'loader_output')
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path)
+        self.fname = os.path.join(self.path, 'figures.root')
+        with RootFileWriter(self.fname) as writer:
+            for i in range(3):
+                fig = Figure()
+                fig.xtitle = "x {0}".format(i)
+                h = Hist1D(10, 0, 10)
+                h.Fill(i)
+                fig.add_plottable(h, legend_title="hist {0}".format(i))
+                fig.add_plottable(h)  # without legend entry
+                fig.legend.position = 'seperate' if i == 2 else 'tr'
+                writer.write(fig, "fig{0}".format(i), path='sub/dir' if i else '')
+        # not a roofie canvas
+        f = TFile.Open(self.fname, 'update')
+        TCanvas('plain').Write()
+        f.Close()
+
+    def test_loads_all_roofie_canvases(self):
+        for copy in (False, True):
+            loaded = dict(iter_figures(self.fname, copy=copy))
+            self.assertEqual(sorted(loaded), ['fig0', 'sub/dir/fig1', 'sub/dir/fig2'])
+            fig = loaded['sub/dir/fig2']
+            self.assertEqual(fig.xtitle, "x 2")
+            self.assertEqual([rec.legend_title for rec in fig._plottables], ["hist 2", ""])
+            self.assertEqual(fig._plottables[0].p.GetBinContent(3), 1)
+            fig.draw_to_canvas()
+
+    def test_is_lazy(self):
+        figures = iter_figures(self.fname)
+        path, fig = next(figures)
+        self.assertEqual(path, 'fig0')
+        figures.close()
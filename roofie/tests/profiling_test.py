@@ -0,0 +1,70 @@
+import os
+import shutil
+import unittest
+
+from rootpy.plotting import Hist1D, Graph
+
+from roofie import Figure, add_render_hook, remove_render_hook
+
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _make_figure():
+    fig = Figure()
+    h = Hist1D(10, 0, 10)
+    h.Fill(5)
+    fig.add_plottable(h, legend_title="hist")
+    g = Graph(3)
+    for i in range(3):
+        g.SetPoint(i, i, i)
+    fig.add_plottable(g, legend_title="graph")
+    return fig
+
+
+class Test_render_profile(unittest.TestCase):
+    def test_off_by_default(self):
+        fig = _make_figure()
+        fig.draw_to_canvas()
+        self.assertIsNone(fig.last_render_profile)
+
+    def test_draw_profile(self):
+        fig = _make_figure()
+        fig.profile_renders = True
+        fig.draw_to_canvas()
+        profile = fig.last_render_profile
+        self.assertEqual(profile.kind, 'draw')
+        self.assertEqual(profile.nplottables, 2)
+        self.assertEqual(profile.npoints, 3)
+        self.assertEqual(profile.nbins, 12)
+        for phase in ('limits', 'frame', 'theme', 'draw', 'legend'):
+            self.assertIn(phase, profile.phases)
+        self.assertGreaterEqual(profile.total, sum(profile.phases.values()))
+
+    def test_export_includes_drawing(self):
+        path = os.path.join(test_dir, 'profiling_output')
+        shutil.rmtree(path, ignore_errors=True)
+        fig = _make_figure()
+        profiles = []
+
+        def hook(fig, profile):
+            profiles.append(profile)
+        add_render_hook(hook)
+        try:
+            fig.export(path, 'fig', formats=('pdf', 'root'))
+        finally:
+            remove_render_hook(hook)
+        # one profile for the export incl. the nested draw
+        self.assertEqual(len(profiles), 1)
+        self.assertIs(fig.last_render_profile, profiles[0])
+        self.assertEqual(profiles[0].kind, 'export')
+        for phase in ('draw', 'print_pdf', 'print_root'):
+            self.assertIn(phase, profiles[0].phases)
+
+    def test_failing_hook_does_not_break_drawing(self):
+        def hook(fig, profile):
+            raise RuntimeError("monitoring is down")
+        add_render_hook(hook)
+        try:
+            _make_figure().draw_to_canvas()
+        finally:
+            remove_render_hook(hook)
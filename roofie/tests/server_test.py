@@ -0,0 +1,53 @@
+import os
+import shutil
+import unittest
+
+from roofie.batch import _mp
+from roofie.client import RenderClient, server_running
+from roofie.server import RenderServer
+from roofie.spec import SPEC_VERSION, graph_spec, hist_spec
+
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+class Test_render_server(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(test_dir, 'server_output')
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path)
+        self.socket_path = os.path.join(self.path, 'roofie.sock')
+        server = RenderServer(self.socket_path)
+        self.process = _mp.Process(target=server.serve)
+        self.process.start()
+        # the forked server owns the listening socket now
+        server.socket.close()
+
+    def tearDown(self):
+        if server_running(self.socket_path):
+            RenderClient(self.socket_path).shutdown()
+        self.process.join(10)
+
+    def test_render(self):
+        spec = {'version': SPEC_VERSION, 'xtitle': 'x',
+                'plottables': [hist_spec([0, 1, 2, 3], [1, 4, 2], legend_title='hist'),
+                               graph_spec([0.5, 1.5], [2, 3], eyl=[1, 1], eyh=[1, 1])]}
+        with RenderClient(self.socket_path) as client:
+            self.assertIn('root', client.ping())
+            paths = client.render(spec, self.path, 'fig', formats=['pdf', 'png'])
+            # the connection is kept for further requests
+            paths += client.render(spec, self.path, 'fig2')
+        self.assertEqual(len(paths), 3)
+        for path in paths:
+            self.assertTrue(os.path.exists(path))
+
+    def test_errors_are_sent_back(self):
+        with RenderClient(self.socket_path) as client:
+            self.assertRaises(RuntimeError, client.render, {'version': -1, 'plottables': []}, self.path, 'bad')
+            # the server keeps running
+            self.assertTrue(client.ping())
+
+    def test_shutdown(self):
+        RenderClient(self.socket_path).shutdown()
+        self.process.join(10)
+        self.assertFalse(self.process.is_alive())
+        self.assertFalse(os.path.exists(self.socket_path))
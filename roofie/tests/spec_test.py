@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from rootpy.plotting import Hist1D
+
+from ROOT import TF1
+
+from roofie import Figure, Styles
+from roofie.spec import FORMAT_VERSION, dumps, loads, hist_spec
+
+
+class Test_binary_format(unittest.TestCase):
+    def test_roundtrip(self):
+        spec = {'a': np.arange(6.).reshape(2, 3), 'b': (1, (2., 'x')), 'c': [None, True],
+                'd': np.arange(3, dtype=np.int32), 'e': np.zeros(0), 'f': np.float64(1.5)}
+        for compress in (False, True):
+            loaded = loads(dumps(spec, compress=compress))
+            np.testing.assert_array_equal(loaded['a'], spec['a'])
+            self.assertEqual(loaded['d'].dtype, np.int32)
+            self.assertEqual(loaded['e'].shape, (0, ))
+            self.assertEqual(loaded['b'], (1, (2., 'x')))
+            self.assertEqual(loaded['c'], [None, True])
+            self.assertEqual(loaded['f'], 1.5)
+
+    def test_dicts_with_reserved_keys(self):
+        spec = {'a': {'__array__': 0, '__tuple__': [1]}, 'b': {'__dict__': {'x': (1, 2)}}}
+        self.assertEqual(loads(dumps(spec)), spec)
+
+    def test_compact(self):
+        spec = hist_spec(np.linspace(0, 1, 1001), np.ones(1000))
+        # little more than the raw arrays
+        self.assertLess(len(dumps(spec)), 2 * 1002 * 8 + 1024)
+
+    def test_rejects_other_data(self):
+        self.assertRaises(ValueError, loads, b'not a spec at all')
+        data = bytearray(dumps({}))
+        data[4] = FORMAT_VERSION + 1
+        self.assertRaises(ValueError, loads, bytes(data))
+
+
+class Test_figure_spec(unittest.TestCase):
+    def test_to_and_from_spec(self):
+        fig = Figure()
+        fig.xtitle = "x"
+        fig.style = Styles.Presentation_half
+        fig.plot.ymin = 0
+        h = Hist1D(20, -2, 2)
+        h.FillRandom('gaus', 100)
+        fig.add_plottable(h, legend_title="data", color=(0.1, 0.2, 0.3))
+        fig.add_plottable(TF1("g", "gaus", -2, 2), legend_title="fit")
+        fig.add_plottable(None, legend_title="only in the legend")
+
+        loaded = Figure.from_spec(fig.to_spec(compress=True))
+        self.assertEqual(loaded.xtitle, "x")
+        self.assertIs(loaded.style, Styles.Presentation_half)
+        self.assertEqual(loaded.plot.ymin, 0)
+        self.assertEqual(loaded._plottables[0].color, (0.1, 0.2, 0.3))
+        self.assertEqual([loaded._plottables[0].p.GetBinContent(i) for i in range(22)],
+                         [h.GetBinContent(i) for i in range(22)])
+        self.assertEqual(loaded._plottables[1].p.GetXmax(), 2)
+        self.assertEqual(loaded._plottables[2].legend_title, "only in the legend")
+        # and it can be drawn
+        loaded.draw_to_canvas()
@@ -0,0 +1,46 @@
+import ctypes
+import unittest
+
+import ROOT
+
+from rootpy.plotting import Hist1D
+
+from roofie import Figure, Styles
+from roofie.utils import scoped_style
+
+
+def _paper_size():
+    width, height = ctypes.c_float(0), ctypes.c_float(0)
+    ROOT.gStyle.GetPaperSize(width, height)
+    return float(width.value), float(height.value)
+
+
+class Test_scoped_style(unittest.TestCase):
+    def test_restores_global_style(self):
+        ROOT.gStyle.SetPaperSize(20, 26)
+        ROOT.gStyle.SetOptStat(1111)
+        with scoped_style():
+            ROOT.gStyle.SetPaperSize(5, 5)
+            ROOT.gStyle.SetOptStat(0)
+        self.assertEqual(_paper_size(), (20, 26))
+        self.assertEqual(ROOT.gStyle.GetOptStat(), 1111)
+
+    def test_drawing_does_not_leak(self):
+        ROOT.gStyle.SetPaperSize(20, 26)
+        fig = Figure()
+        fig.style = Styles.Presentation_half
+        fig.add_plottable(Hist1D(10, 0, 10))
+        fig._get_canvas()
+        self.assertEqual(_paper_size(), (20, 26))
+
+
+class Test_theming(unittest.TestCase):
+    def test_style_change_is_applied(self):
+        fig = Figure()
+        fig.add_plottable(Hist1D(10, 0, 10))
+        fig.draw_to_canvas()
+        h = fig._plottables[0].p
+        self.assertAlmostEqual(h.GetXaxis().GetLabelSize(), Styles.Presentation_full.axisLabelSize)
+        fig.style = Styles.Public_full
+        fig.draw_to_canvas()
+        self.assertAlmostEqual(h.GetXaxis().GetLabelSize(), Styles.Public_full.axisLabelSize)
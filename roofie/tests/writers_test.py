@@ -0,0 +1,71 @@
+import os
+import shutil
+import unittest
+
+from rootpy.plotting import Hist1D
+
+from ROOT import TCanvas, TFile
+
+from roofie import Figure, Styles, PdfBook, RootFileWriter
+
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _make_figure(x, style=Styles.Presentation_full):
+    fig = Figure()
+    fig.style = style
+    h = Hist1D(10, 0, 10)
+    h.Fill(x)
+    fig.add_plottable(h, legend_title="hist {0}".format(x))
+    return fig
+
+
+class Test_PdfBook(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(test_dir, 'writers_output')
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def test_pages_of_different_size(self):
+        fname = os.path.join(self.path, 'book.pdf')
+        with PdfBook(fname) as book:
+            book.add(_make_figure(1))
+            book.add(_make_figure(2, Styles.Presentation_half))
+            book.add(_make_figure(3, Styles.Public_full))
+        self.assertEqual(book.npages, 3)
+        self.assertTrue(os.path.exists(fname))
+        self.assertRaises(ValueError, book.add, _make_figure(4))
+
+
+class Test_RootFileWriter(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(test_dir, 'writers_output')
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path)
+
+    def test_write_many_figures(self):
+        fname = os.path.join(self.path, 'figures.root')
+        with RootFileWriter(fname, compression='lzma', level=5, buffer_size=2) as writer:
+            for i in range(5):
+                writer.write(_make_figure(i), 'fig', path='run_{0}/sub'.format(i % 2))
+            writer.write(_make_figure(5), 'top')
+        f = TFile(fname, "read")
+        self.assertEqual(f.GetCompressionAlgorithm(), 2)
+        self.assertIsInstance(f.Get("run_1/sub/fig"), TCanvas)
+        self.assertIsInstance(f.Get("top"), TCanvas)
+        f.Close()
+
+    def test_update_keeps_compression(self):
+        fname = os.path.join(self.path, 'update.root')
+        with RootFileWriter(fname, compression='lzma', level=5) as writer:
+            writer.write(_make_figure(1), 'first')
+        with RootFileWriter(fname, mode='update') as writer:
+            self.assertEqual(writer._file.GetCompressionSettings(), 205)
+            writer.write(_make_figure(2), 'second')
+        with RootFileWriter(fname, mode='update', level=9) as writer:
+            self.assertEqual(writer._file.GetCompressionSettings(), 209)
+        # a new file gets the defaults
+        with RootFileWriter(os.path.join(self.path, 'new.root'), mode='update') as writer:
+            self.assertEqual(writer._file.GetCompressionSettings(), 101)
+
+    def test_unknown_compression(self):
+        self.assertRaises(ValueError, RootFileWriter, os.path.join(self.path, 'x.root'), compression='foo')
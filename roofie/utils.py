@@ -1,9 +1,36 @@
-import ROOT
+from contextlib import contextmanager
+
+from ._root import ROOT
+
+
+@contextmanager
+def scoped_style():
+    """
+    Take a snapshot of the global `gStyle` and restore it when leaving
+    the context, so that changes made while rendering (eg. the paper
+    size) do not leak into other figures or the user's own plots.
+
+    Note that the color palette is not part of `gStyle` in ROOT and is
+    not restored.
+
+    Example
+    -------
+        with scoped_style():
+            _turn_on_style()
+            canvas.Print('fig.pdf')
+    """
+    style = ROOT.gStyle
+    snapshot = ROOT.TStyle()
+    style.Copy(snapshot)
+    try:
+        yield style
+    finally:
+        snapshot.Copy(style)
 
 
 def _turn_on_style():
     """
-    Would be nice to scope this style, but root is very wonky in this regard...
+    Modifies the global gStyle; use it within `scoped_style` to keep that local
     """
     # self._previous_style = ROOT.gStyle.Clone('previous_style')
     ROOT.gStyle.Reset("Plain")
@@ -0,0 +1,191 @@
+"""
+Writers which put many figures into a single output file.
+"""
+
+import os
+
+from ._root import ROOT
+
+from .utils import scoped_style
+
+# Compression algorithms as numbered by ROOT (see `ROOT::RCompressionSetting::EAlgorithm`)
+COMPRESSION_ALGORITHMS = {
+    'zlib': 1,
+    'lzma': 2,
+    'lz4': 4,
+    'zstd': 5,
+}
+
+
+class PdfBook(object):
+    """
+    Write figures as the pages of one pdf file.
+
+    All pages share one file handle and the fonts are only embedded
+    once, which makes the result much smaller and faster to write than
+    one pdf file per figure. Each page gets the size of its figure's style.
+
+    Example
+    -------
+        with PdfBook('plots/comparison.pdf') as book:
+            for fig in figures:
+                book.add(fig)
+
+    Parameters
+    ----------
+    path : string
+        Path of the pdf file; the folder is created if needed
+    """
+    def __init__(self, path):
+        self.path = path
+        self.npages = 0
+        # ROOT needs a canvas to close the file
+        self._last_canvas = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, fig):
+        """
+        Append the given Figure as a new page
+        """
+        if self._last_canvas is None and self.npages > 0:
+            raise ValueError("Cannot add pages to a closed PdfBook")
+        width = fig.style.canvasWidth / fig.style.pt_per_cm
+        height = fig.style.canvasHeight / fig.style.pt_per_cm
+        c = fig._get_canvas()
+        if self.npages == 0:
+            folder = os.path.dirname(self.path)
+            if folder and not os.path.isdir(folder):
+                os.makedirs(folder)
+            with scoped_style():
+                ROOT.gStyle.SetPaperSize(width, height)
+                # '[' opens the file without printing a page
+                c.Print(self.path + '[')
+        elif ROOT.gVirtualPS:
+            # the page size of an already open file is not taken from gStyle anymore
+            ROOT.gVirtualPS.Range(width, height)
+        c.Print(self.path)
+        self.npages += 1
+        self._last_canvas = c
+
+    def close(self):
+        """
+        Finish the file; called automatically when used as a context manager
+        """
+        if self._last_canvas is not None:
+            # ']' closes the file without printing another page
+            self._last_canvas.Print(self.path + ']')
+            self._last_canvas = None
+
+
+class RootFileWriter(object):
+    """
+    Stream the canvases of many figures into one root file.
+
+    The file stays open until `close` is called, the directories
+    within it are only looked up (or created) once and the canvases are
+    written in batches.
+
+    Example
+    -------
+        with RootFileWriter('qa.root', compression='lzma', level=5) as writer:
+            for run, fig in figures:
+                writer.write(fig, 'spectrum', path='run_{0}'.format(run))
+
+    Parameters
+    ----------
+    path : string
+        Path of the root file
+    mode : string
+        'recreate' or 'update'
+    compression : string
+        One of `COMPRESSION_ALGORITHMS`; defaults to 'zlib' for new
+        files and to the current setting of updated files
+    level : int
+        Compression level between 0 (none) and 9 (smallest file);
+        defaults to 1 for new files and to the current setting of updated files
+    buffer_size : int
+        Number of canvases which are collected before they are written to the file
+    """
+    def __init__(self, path, mode='recreate', compression=None, level=None, buffer_size=50):
+        if compression is not None and compression not in COMPRESSION_ALGORITHMS:
+            raise ValueError("Unknown compression algorithm '{0}'".format(compression))
+        self.path = path
+        self.buffer_size = buffer_size
+        updating = mode.lower() == 'update' and os.path.exists(path)
+        self._file = ROOT.TFile.Open(path, mode)
+        if not self._file or self._file.IsZombie():
+            raise IOError("Could not open {0}".format(path))
+        if updating:
+            # keep the settings of the existing file unless asked otherwise
+            if compression is None and level is None:
+                algorithm = None
+            else:
+                algorithm = (COMPRESSION_ALGORITHMS[compression] if compression is not None
+                             else self._file.GetCompressionAlgorithm())
+                level = level if level is not None else self._file.GetCompressionLevel()
+        else:
+            algorithm = COMPRESSION_ALGORITHMS[compression or 'zlib']
+            level = level if level is not None else 1
+        if algorithm is not None:
+            self._file.SetCompressionSettings(100 * algorithm + level)
+        self._dirs = {'': self._file}
+        self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _directory(self, path):
+        """
+        The (cached) directory at `path` within the file; created if needed
+        """
+        path = path.strip('/')
+        try:
+            return self._dirs[path]
+        except KeyError:
+            pass
+        parent_path, _, name = path.rpartition('/')
+        parent = self._directory(parent_path)
+        directory = parent.GetDirectory(name)
+        if not directory:
+            directory = parent.mkdir(name)
+        self._dirs[path] = directory
+        return directory
+
+    def write(self, fig, name, path=''):
+        """
+        Queue the canvas of the given Figure to be written as `name` into the directory `path`
+        """
+        if self._file is None:
+            raise ValueError("Cannot write to a closed RootFileWriter")
+        self._buffer.append((fig._get_canvas(), name, path))
+        # the next draw of a figure with `reuse_canvas` overwrites its canvas
+        if fig.reuse_canvas or len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all queued canvases to the file
+        """
+        for c, name, path in self._buffer:
+            if self._directory(path).WriteTObject(c, name) == 0:
+                raise ValueError("Could not write {0} to {1}".format(name, self.path))
+        self._buffer = []
+
+    def close(self):
+        """
+        Flush and close the file; called automatically when used as a context manager
+        """
+        if self._file is None:
+            return
+        self.flush()
+        self._file.Close()
+        self._file = None
+        self._dirs = {}
@@ -1,6 +1,6 @@
 from setuptools import setup
 
-install_requires = ['rootpy']
+install_requires = ['rootpy', 'numpy']
 tests_require = ['nose']
 
 setup(